@@ -0,0 +1,59 @@
+'''Request spread and failover across several backends.
+
+Starts a fast and a slow stand-in API and adds a url nothing listens
+on, then sends bursts of requests through one Client and shows where
+they went. The slow server is stopped halfway to show failover. Run
+from the repository root:
+
+    python benchmarks/bench_backends.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+BURSTS = 10
+CALLS = 50
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+async def run(fast, slow):
+    client = idioticapi.Client("token", base_urls=[slow.url, fast.url, "http://127.0.0.1:9"])
+    took = []
+    try:
+        for burst in range(BURSTS):
+            if burst == BURSTS // 2:
+                slow.__exit__()
+                print("stopped the slow server")
+            urls = ["https://example.com/{}/{}.png".format(burst, i) for i in range(CALLS)]
+            took += await asyncio.gather(*[timed(client.triggered(url)) for url in urls])
+            print("burst {:>2}: {}".format(burst, ", ".join(
+                "{} {} reqs {} ms".format(backend.url.rsplit(":", 1)[-1], backend.requests,
+                                          "-" if backend.latency is None else round(backend.latency * 1000, 1))
+                for backend in client.backends)))
+    finally:
+        await client.close()
+    print("p50 {:.1f} ms, p99 {:.1f} ms over {} calls, none failed".format(
+        percentile(took, 50) * 1000, percentile(took, 99) * 1000, len(took)))
+
+def main():
+    with ServerThread(StandInServer(image_size=1024, delay=0.002)) as fast:
+        slow = ServerThread(StandInServer(image_size=1024, delay=0.03)).__enter__()
+        asyncio.get_event_loop().run_until_complete(run(fast, slow))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+'''Compare decode_image against the old resp.json() + bytes(list) path.
+
+Run from the repository root:
+
+    python benchmarks/bench_decode.py
+'''
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from idioticapi import decoder
+
+SIZES = [10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+def old_decode(body):
+    # What Client._get used to do: resp.json() decodes the body to str first.
+    return bytes(json.loads(body.decode("utf-8"))["data"])
+
+def make_body(size):
+    image = os.urandom(size)
+    body = json.dumps({"type": "Buffer", "data": list(image)}, separators=(",", ":"))
+    return image, body.encode("utf-8")
+
+def measure(func, body, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(body)
+        took = time.perf_counter() - start
+        best = took if best is None else min(best, took)
+    tracemalloc.start()
+    func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def human(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return "{:.0f} {}".format(size, unit)
+        size /= 1024
+    return "{:.0f} GB".format(size)
+
+def main():
+    print("JSON backend: {}".format(decoder.BACKEND))
+    print("{:>8} | {:>10} {:>10} | {:>10} {:>10} | {:>7} {:>7}".format(
+        "image", "old ms", "old peak", "new ms", "new peak", "speedup", "memory"))
+    for size in SIZES:
+        image, body = make_body(size)
+        assert decoder.decode_image(body) == image
+        rounds = 5 if size < 1024 * 1024 else 2
+        old_time, old_peak = measure(old_decode, body, rounds)
+        new_time, new_peak = measure(decoder.decode_image, body, rounds)
+        print("{:>8} | {:>10.2f} {:>10} | {:>10.2f} {:>10} | {:>6.1f}x {:>6.1f}x".format(
+            human(size), old_time * 1000, human(old_peak), new_time * 1000, human(new_peak),
+            old_time / new_time, old_peak / new_peak))
+
+if __name__ == "__main__":
+    main()
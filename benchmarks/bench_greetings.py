@@ -0,0 +1,56 @@
+'''Join handler latency with and without prerendered greeting cards.
+
+The stand-in API takes 200 ms per card, about what rendering one
+costs. Prerenders the next 20 member counts of a pending member in
+the background, then times greet() for counts that were prerendered
+and for ones that weren't. Run from the repository root:
+
+    python benchmarks/bench_greetings.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+AHEAD = 20
+COUNT = 1000
+
+async def run(server):
+    client = idioticapi.Client("token", cache=idioticapi.MemoryCache(), scheduler=idioticapi.Scheduler(8))
+    client.base_url = server.url
+    template = idioticapi.GreetingTemplate("welcome", "gearz", guild="Idiots", message="Have fun!")
+    member = idioticapi.Member("https://example.com/avatar.png", "someone", "0001")
+    try:
+        await client.warmup()
+        start = time.perf_counter()
+        results = await client.prerender_greetings(template, [member], range(COUNT + 1, COUNT + 1 + AHEAD))
+        prerender = time.perf_counter() - start
+        failed = sum(not result.ok for result in results)
+
+        rows = []
+        for label, count in (("prerendered", COUNT + 1), ("prerendered", COUNT + AHEAD), ("not prerendered", COUNT + AHEAD + 1)):
+            start = time.perf_counter()
+            await client.greet(template, member, count)
+            rows.append((label, count, time.perf_counter() - start))
+    finally:
+        await client.close()
+    return prerender, failed, rows
+
+def main():
+    server = StandInServer(delay=0.2)
+    loop = asyncio.get_event_loop()
+    with ServerThread(server):
+        prerender, failed, rows = loop.run_until_complete(run(server))
+    print("prerendered {} cards in {:.2f} s, {} failed".format(AHEAD, prerender, failed))
+    for label, count, took in rows:
+        print("greet at {:<6} {:<16} {:>9.2f} ms".format(count, label, took * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+'''How long large image decodes stall the event loop.
+
+Requests images of a few sizes from the stand-in API while a ticker
+task measures how late the loop wakes it up, once with everything
+decoded inline and once with large bodies decoded in the Client's
+decode pool. Run from the repository root:
+
+    python benchmarks/bench_offload.py
+'''
+
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+SIZES = [256 * 1024, 2 * 1024 * 1024, 8 * 1024 * 1024]
+REQUESTS = 4
+TICK = 0.005
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def measure(url, **options):
+    client = idioticapi.Client("token", **options)
+    client.base_url = url
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        await client.triggered("https://example.com/{}.png".format(i))
+    took = time.perf_counter() - start
+    stop.set()
+    await tick
+    await client.close()
+    return took, max(lags)
+
+def main():
+    modes = [
+        ("inline", {"decode_threshold": None}),
+        ("threads", {}),
+        ("processes", {"decode_executor": concurrent.futures.ProcessPoolExecutor(2)})
+    ]
+    print("{:>7} | {:>9} | {:>10} {:>12}".format("image", "mode", "total ms", "max stall ms"))
+    server = StandInServer()
+    with ServerThread(server):
+        for size in SIZES:
+            server.image_size = size
+            server.image_body(size)
+            for name, options in modes:
+                took, stall = asyncio.get_event_loop().run_until_complete(measure(server.url, **options))
+                print("{:>5.1f}MB | {:>9} | {:>10.1f} {:>12.1f}".format(size / 1024 / 1024, name, took * 1000, stall * 1000))
+
+if __name__ == "__main__":
+    main()
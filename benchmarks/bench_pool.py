@@ -0,0 +1,63 @@
+'''Tail latency of a burst of requests with and without Client.warmup.
+
+Starts the stand-in API over TLS and fires CONCURRENCY requests at
+once, first from a fresh Client and then from one that opened its
+connections ahead of time with warmup(). Run from the repository root:
+
+    python benchmarks/bench_pool.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from certs import trust_certificate
+
+CERTIFICATE = trust_certificate()
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+CONCURRENCY = 50
+ROUNDS = 5
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+async def burst(server, warm):
+    client = idioticapi.Client("token", limit=CONCURRENCY)
+    client.base_url = server.url
+    if warm:
+        await client.warmup(CONCURRENCY)
+    # Distinct names so the requests aren't coalesced into one.
+    latencies = await asyncio.gather(*[timed(client.blame(str(i))) for i in range(CONCURRENCY)])
+    await client.close()
+    return latencies
+
+async def main():
+    server = StandInServer(image_size=1024, delay=0.02, certificate=CERTIFICATE)
+    with ServerThread(server):
+        print("{} concurrent requests over TLS, {} rounds".format(CONCURRENCY, ROUNDS))
+        print("{:>8} | {:>8} {:>8} {:>8}".format("client", "p50 ms", "p95 ms", "p99 ms"))
+        for warm in (False, True):
+            latencies = []
+            for _ in range(ROUNDS):
+                latencies.extend(await burst(server, warm))
+            print("{:>8} | {:>8.2f} {:>8.2f} {:>8.2f}".format(
+                "warm" if warm else "cold",
+                percentile(latencies, 50) * 1000,
+                percentile(latencies, 95) * 1000,
+                percentile(latencies, 99) * 1000))
+
+if __name__ == "__main__":
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,69 @@
+'''Latency of interactive calls while background work is queued.
+
+Starts a burst of background calls against the stand-in API, which
+takes 50 ms per request, and makes an interactive call every 100 ms
+while the burst is still queued. Both go through one Client
+limited to 8 connections, once without a scheduler (first come first
+served in the connection pool) and once with a Scheduler. Reports the
+interactive latency and how long the background burst took overall.
+Run from the repository root:
+
+    python benchmarks/bench_scheduler.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+CONCURRENCY = 8
+BACKGROUND = 400
+INTERACTIVE = 20
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+async def run(server, scheduler):
+    client = idioticapi.Client("token", limit=CONCURRENCY, scheduler=scheduler)
+    client.base_url = server.url
+    background = client.with_priority("background")
+    interactive = client.with_priority("interactive")
+    try:
+        await client.warmup(CONCURRENCY)
+        start = time.perf_counter()
+        burst = asyncio.ensure_future(asyncio.gather(*[
+            background.triggered("https://example.com/{}.png".format(i)) for i in range(BACKGROUND)]))
+        took = []
+
+        async def command(i):
+            await asyncio.sleep(0.1 * (i + 1))
+            begun = time.perf_counter()
+            await interactive.blame("someone {}".format(i))
+            took.append(time.perf_counter() - begun)
+
+        await asyncio.gather(*[command(i) for i in range(INTERACTIVE)])
+        await burst
+        total = time.perf_counter() - start
+    finally:
+        await client.close()
+    return took, total
+
+def main():
+    server = StandInServer(image_size=4 * 1024, delay=0.05)
+    loop = asyncio.get_event_loop()
+    print("{:<12} {:>16} {:>16} {:>18}".format("scheduler", "interactive p50", "interactive p95", "background total"))
+    with ServerThread(server):
+        for label, scheduler in (("none", None), ("Scheduler", idioticapi.Scheduler(CONCURRENCY))):
+            took, total = loop.run_until_complete(run(server, scheduler))
+            print("{:<12} {:>13.1f} ms {:>13.1f} ms {:>16.2f} s".format(
+                label, percentile(took, 50) * 1000, percentile(took, 95) * 1000, total))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+'''Per-call latency of the text endpoints, local transforms vs requests.
+
+Times each text endpoint through Client(local_text=True) and through
+a request to the stand-in API on localhost, which is the floor of
+what a round trip to the real API costs. Run from the repository root:
+
+    python benchmarks/bench_text.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+TEXT = "The quick brown fox jumps over the lazy dog, really lovely now"
+CALLS = {
+    "owoify": (TEXT,),
+    "mock": (TEXT,),
+    "tiny": (TEXT, "superscript"),
+    "cursive": (TEXT, "normal"),
+    "vapor": (TEXT,)
+}
+LOCAL_ROUNDS = 20000
+REMOTE_ROUNDS = 200
+
+async def per_call(client, name, args, rounds):
+    method = getattr(client, name)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await method(*args)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+async def run(url):
+    local = idioticapi.Client("token", dev=True, local_text=True)
+    remote = idioticapi.Client("token", dev=True)
+    remote.base_url = url
+    print("{:>8} | {:>10} | {:>12} | {:>8}".format("endpoint", "local us", "localhost us", "speedup"))
+    try:
+        for name, args in CALLS.items():
+            local_us = await per_call(local, name, args, LOCAL_ROUNDS)
+            remote_us = await per_call(remote, name, args, REMOTE_ROUNDS)
+            print("{:>8} | {:>10.2f} | {:>12.1f} | {:>7.0f}x".format(name, local_us, remote_us, remote_us / local_us))
+    finally:
+        await local.close()
+        await remote.close()
+
+def main():
+    with ServerThread(StandInServer()) as server:
+        asyncio.get_event_loop().run_until_complete(run(server.url))
+
+if __name__ == "__main__":
+    main()
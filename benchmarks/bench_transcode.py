@@ -0,0 +1,88 @@
+'''Size and time of transcoded results.
+
+Serves a greeting-sized PNG and an animated GIF like triggered's from
+the stand-in API, and requests them through Clients with different
+Transcoder settings. Reports the bytes returned, the time of the
+first call (fetch and transcode) and of a repeat call, which comes
+from the cache. Needs numpy and Pillow. Run from the repository root:
+
+    python benchmarks/bench_transcode.py
+'''
+
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy
+from PIL import Image
+
+import idioticapi
+from server import ServerThread, StandInServer
+
+SETTINGS = [
+    ("original", None),
+    ("webp q80", idioticapi.Transcoder("webp", quality=80)),
+    ("jpeg q80", idioticapi.Transcoder("jpeg", quality=80)),
+    ("webp q80 max 512", idioticapi.Transcoder("webp", quality=80, max_size=512)),
+    ("gif 64 colours", idioticapi.Transcoder(None, colours=64)),
+    ("animated webp", idioticapi.Transcoder("webp", animation="webp"))
+]
+
+def still():
+    # A photo-like 1024x450 banner: gradients with some noise.
+    rng = numpy.random.RandomState(0)
+    y, x = numpy.mgrid[0:450, 0:1024]
+    pixels = numpy.stack([x * 255 // 1024, y * 255 // 450, (x + y) % 256], axis=-1)
+    pixels = numpy.clip(pixels + rng.randint(-12, 12, pixels.shape), 0, 255).astype("uint8")
+    out = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(out, "PNG")
+    return out.getvalue()
+
+def animated():
+    # A shaking 256x256 avatar over 12 frames, like triggered.
+    rng = numpy.random.RandomState(1)
+    base = rng.randint(0, 255, (8, 8, 3)).astype("uint8")
+    avatar = Image.fromarray(base, "RGB").resize((300, 300), Image.BICUBIC)
+    frames = []
+    for i in range(12):
+        dx, dy = rng.randint(0, 44, 2)
+        frames.append(avatar.crop((dx, dy, dx + 256, dy + 256)))
+    out = io.BytesIO()
+    frames[0].save(out, "GIF", save_all=True, append_images=frames[1:], duration=20, loop=0)
+    return out.getvalue()
+
+async def run(server, transcoder):
+    client = idioticapi.Client("token", cache=idioticapi.MemoryCache(), transcoder=transcoder)
+    client.base_url = server.url
+    rows = []
+    try:
+        await client.warmup()
+        for name, call in (("blame", lambda: client.blame("someone")),
+                           ("triggered", lambda: client.triggered("https://example.com/a.png"))):
+            start = time.perf_counter()
+            result = await call()
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            await call()
+            again = time.perf_counter() - start
+            rows.append((name, len(result), first * 1000, again * 1000))
+    finally:
+        await client.close()
+    return rows
+
+def main():
+    server = StandInServer(image_data={"blame": still(), "triggered": animated()})
+    loop = asyncio.get_event_loop()
+    print("{:<18} {:<10} {:>10} {:>12} {:>12}".format("settings", "endpoint", "bytes", "first", "cached"))
+    with ServerThread(server):
+        for label, transcoder in SETTINGS:
+            for name, size, first, again in loop.run_until_complete(run(server, transcoder)):
+                print("{:<18} {:<10} {:>10} {:>9.1f} ms {:>9.2f} ms".format(label, name, size, first, again))
+
+if __name__ == "__main__":
+    main()
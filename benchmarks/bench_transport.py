@@ -0,0 +1,81 @@
+'''Bytes on the wire and decode time for each response format.
+
+Serves images from the stand-in API as the JSON array and as raw
+image/png bytes, each plain and gzipped, and reports per endpoint the
+bytes received per call (from the Client's metrics), the time spent
+decoding the body and the time per call. Run from the repository root:
+
+    python benchmarks/bench_transport.py
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from idioticapi import decoder
+from server import ServerThread, StandInServer
+
+# Image sizes by endpoint, roughly what the API returns.
+ENDPOINTS = {"blame": 48 * 1024, "wanted": 256 * 1024, "triggered": 1024 * 1024}
+MODES = [
+    ("json", {}),
+    ("json+gzip", {"compress": True}),
+    ("raw", {"raw": True}),
+    ("raw+gzip", {"raw": True, "compress": True})
+]
+CALLS = 20
+
+def human(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return "{:.0f} {}".format(size, unit)
+        size /= 1024
+    return "{:.1f} GB".format(size)
+
+def decode_ms(server, size, raw):
+    # The Client does nothing to raw bodies, JSON ones go through decode_image.
+    if raw:
+        return 0.0
+    body = server.image_body(size)
+    start = time.perf_counter()
+    decoder.decode_image(body)
+    return (time.perf_counter() - start) * 1000
+
+async def run(server, raw):
+    metrics = idioticapi.Metrics()
+    client = idioticapi.Client("token", metrics=metrics)
+    client.base_url = server.url
+    rows = {}
+    try:
+        await client.warmup()
+        for name in ENDPOINTS:
+            method = client.blame if name == "blame" else getattr(client, name)
+            arg = "someone" if name == "blame" else "https://example.com/a.png"
+            start = time.perf_counter()
+            for i in range(CALLS):
+                image = await method(arg + str(i))
+                assert image == server.image_bytes(ENDPOINTS[name])
+            took = (time.perf_counter() - start) / CALLS * 1000
+            stats = metrics.get(name)
+            rows[name] = (stats.response_bytes / stats.requests, decode_ms(server, ENDPOINTS[name], raw), took)
+    finally:
+        await client.close()
+    return rows
+
+def main():
+    print("Accept-Encoding: {}".format(decoder.ACCEPT_ENCODING))
+    print("{:>9} | {:>9} | {:>10} {:>10} {:>8}".format("endpoint", "format", "wire/call", "decode ms", "call ms"))
+    for mode, options in MODES:
+        server = StandInServer(image_sizes=ENDPOINTS, **options)
+        with ServerThread(server):
+            rows = asyncio.get_event_loop().run_until_complete(run(server, options.get("raw", False)))
+        for name, (wire, decode, took) in rows.items():
+            print("{:>9} | {:>9} | {:>10} {:>10.2f} {:>8.2f}".format(name, mode, human(wire), decode, took))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+'''Self-signed certificates for serving the stand-in API over TLS.
+
+aiohttp builds its default SSL context when it is imported, so
+trust_certificate() has to run before aiohttp or idioticapi is
+imported for the Client to accept the certificate.
+'''
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+def make_certificate(directory):
+    '''Create a self-signed certificate for 127.0.0.1 with openssl.
+
+    Returns the (certfile, keyfile) paths.
+    '''
+
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is needed to serve the stand-in API over TLS")
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.check_call([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+        "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        "-keyout", key, "-out", cert
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert, key
+
+def trust_certificate():
+    '''Create a certificate and make it the trusted CA bundle.
+
+    Returns the (certfile, keyfile) paths.
+    '''
+
+    cert, key = make_certificate(tempfile.mkdtemp())
+    os.environ["SSL_CERT_FILE"] = cert
+    return cert, key
@@ -0,0 +1,290 @@
+'''Regression checks of the Client against the stand-in API.
+
+Each check_* function sets up what once went wrong and asserts it
+doesn't any more. Run from the repository root:
+
+    python benchmarks/checks.py
+
+Exits with 1 when a check fails.
+'''
+
+import asyncio
+import concurrent.futures
+import io
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from idioticapi.avatar import normalize_avatar
+from server import ServerThread, StandInServer
+
+def client_for(server, **options):
+    client = idioticapi.Client("token", **options)
+    client.base_url = server.url
+    return client
+
+async def check_breaker_probe_returned():
+    # A half-open probe taken by a request that fails before it is
+    # sent must be given back, or the circuit never closes again.
+    breaker = idioticapi.CircuitBreaker(min_calls=1, cooldown=0.05)
+    async with StandInServer() as server:
+        async with client_for(server, breaker=breaker) as client:
+            breaker.record("/blame", 500, None, 0.0)
+            await asyncio.sleep(0.06)
+            assert breaker.state("generators") == "half-open"
+
+            choose = client.backends.choose
+            def broken(*args):
+                client.backends.choose = choose
+                raise ValueError("no backend")
+            client.backends.choose = broken
+            try:
+                await client.blame("someone")
+            except ValueError:
+                pass
+            await client.blame("someone")
+            assert breaker.state("generators") == "closed", breaker.states()
+
+async def check_only_avatar_urls_normalized():
+    # Attachments are signed by their query and have no png twin,
+    # rewriting them like avatars breaks them.
+    for url in ("https://cdn.discordapp.com/attachments/1/2/photo.png?ex=1&is=2&hm=3",
+                "https://media.discordapp.net/attachments/1/2/cat.webp"):
+        assert normalize_avatar(url) == url, url
+    assert (normalize_avatar("https://cdn.discordapp.com/avatars/1/a.webp?size=1024")
+            == "https://cdn.discordapp.com/avatars/1/a.png?size=256")
+
+async def check_failover_is_one_breaker_outcome():
+    # A call a second backend answered after the first one refused
+    # the connection succeeded, the breaker mustn't count it failed.
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead = "http://127.0.0.1:{}".format(sock.getsockname()[1])
+    breaker = idioticapi.CircuitBreaker()
+    async with StandInServer() as server:
+        async with idioticapi.Client("token", breaker=breaker, base_urls=[dead, server.url]) as client:
+            # The dead backend is tried first on every call, as it is
+            # at low traffic once its cooldown has passed.
+            client.backends.cooldown = 0
+            for i in range(10):
+                await client.triggered("https://example.com/{}.png".format(i))
+            assert server.requests == 10, server.requests
+            assert breaker.state("generators") == "closed", breaker.states()
+
+async def check_sync_timeout_cancels_request():
+    # A blocking call that timed out must not keep its scheduler slot,
+    # and iter_stream must be usable without an event loop.
+    server = StandInServer(delay=0.5)
+    with ServerThread(server):
+        scheduler = idioticapi.Scheduler(concurrency=1)
+        with idioticapi.SyncClient("token", timeout=0.05, scheduler=scheduler, base_urls=[server.url]) as client:
+            try:
+                client.triggered("https://example.com/a.png")
+            except concurrent.futures.TimeoutError:
+                pass
+            else:
+                raise AssertionError("the call didn't time out")
+            time.sleep(0.05)
+            assert scheduler.active == 0, scheduler
+            client.timeout = None
+            chunks = list(client.iter_stream("triggered", "https://example.com/b.png"))
+            assert sum(map(len, chunks)) == server.image_size, sum(map(len, chunks))
+
+async def check_metrics_hooks_cannot_break_requests():
+    # Hooks that raise are logged, the request still succeeds.
+    metrics = idioticapi.Metrics()
+    calls = []
+
+    @metrics.on_request_start
+    def start(endpoint, url):
+        calls.append("start")
+        raise RuntimeError("start hook")
+
+    @metrics.on_request_end
+    def end(endpoint, url, status, elapsed, error):
+        calls.append("end")
+        raise RuntimeError("end hook")
+
+    logger = logging.getLogger("idioticapi.metrics")
+    logger.disabled = True
+    try:
+        async with StandInServer() as server:
+            async with client_for(server, metrics=metrics) as client:
+                assert len(await client.blame("someone")) == server.image_size
+    finally:
+        logger.disabled = False
+    assert calls == ["start", "end"], calls
+    assert metrics.get("blame").errors == 0
+
+async def check_cancelled_call_cancels_request():
+    # A call whose only caller is cancelled is cancelled with it, and
+    # its failure isn't logged as never retrieved.
+    loop = asyncio.get_event_loop()
+    unhandled = []
+    handler = loop.get_exception_handler()
+    loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+    try:
+        async with StandInServer(delay=0.1, error_rate=1.0) as server:
+            async with client_for(server) as client:
+                lone = asyncio.ensure_future(client.blame("alone"))
+                first = asyncio.ensure_future(client.blame("shared"))
+                second = asyncio.ensure_future(client.blame("shared"))
+                await asyncio.sleep(0.02)
+                lone.cancel()
+                first.cancel()
+                await asyncio.sleep(0)
+                assert len(client.inflight) == 1, client.inflight
+                try:
+                    await second
+                except idioticapi.HTTPException:
+                    pass
+                await asyncio.sleep(0.15)
+                assert len(client.inflight) == 0
+        import gc
+        gc.collect()
+        await asyncio.sleep(0)
+    finally:
+        loop.set_exception_handler(handler)
+    assert not unhandled, unhandled
+
+async def check_disk_cache_evicts_to_watermark():
+    # A full DiskCache evicts down to its low watermark and rescans the
+    # directory only every rescan_every evictions, not on every write.
+    with tempfile.TemporaryDirectory() as directory:
+        cache = idioticapi.DiskCache(directory, max_bytes=100 * 1024, rescan_every=50)
+        scans = []
+        rescan = cache.rescan
+        cache.rescan = lambda: scans.append(1) or rescan()
+        blob = b"x" * 1024
+        for i in range(300):
+            cache.set(("url", "/blame", (("i", str(i)),)), blob)
+            assert cache.size <= cache.max_bytes
+        assert len(scans) <= 1 + cache.evictions // 50, (len(scans), cache.evictions)
+
+        # Large results are written from the executor and read back.
+        async with StandInServer() as server:
+            async with client_for(server, cache=cache, decode_threshold=1024) as client:
+                image = await client.blame("someone")
+                assert await client.blame("someone") == image
+                assert server.requests == 1
+
+async def check_rate_limits_keyed_by_endpoint_name():
+    # per_endpoint is keyed by the method name, even where the path
+    # ends differently, e.g. greeting is /greetings/unified.
+    limiter = idioticapi.RateLimiter(rate=1000, per_endpoint={"greeting": 5, "invert_greyscale": 5})
+    async with StandInServer() as server:
+        async with client_for(server, dev=True, ratelimiter=limiter) as client:
+            await client.greeting("welcome", "gearz", False, "https://example.com/a.png", "someone", "0001", "Idiots", 10)
+            await client.invert_greyscale("https://example.com/a.png")
+    assert limiter.endpoints["greeting"].tokens < 5
+    assert limiter.endpoints["invert_greyscale"].tokens < 5
+
+async def check_dev_mirror_serves_dev_only_endpoints():
+    # A production primary doesn't serve karen, a development mirror
+    # next to it does, so karen goes there instead of being refused.
+    async with StandInServer() as prod, StandInServer() as mirror:
+        async with idioticapi.Client("token", base_urls=[prod.url, (mirror.url, True)]) as client:
+            await client.karen("https://example.com/a.png")
+            await client.request("karen", "https://example.com/b.png")
+            await client.stream("karen", "https://example.com/c.png", into=io.BytesIO())
+            assert (prod.requests, mirror.requests) == (0, 3), (prod.requests, mirror.requests)
+        async with client_for(prod) as client:
+            try:
+                await client.karen("https://example.com/a.png")
+            except idioticapi.NotAvailable:
+                pass
+            else:
+                raise AssertionError("karen was requested from production")
+
+async def check_metrics_keyed_by_endpoint_name():
+    # Metrics are keyed by the method name like the other per
+    # endpoint settings, greeting rather than unified.
+    metrics = idioticapi.Metrics()
+    seen = []
+    metrics.on_request_end(lambda endpoint, *args: seen.append(endpoint))
+    async with StandInServer() as server:
+        async with client_for(server, dev=True, metrics=metrics, cache=idioticapi.MemoryCache()) as client:
+            for _ in range(2):
+                await client.greeting("welcome", "gearz", False, "https://example.com/a.png", "someone", "0001", "Idiots", 10)
+                await client.vapor("hello")
+                await client.invert_greyscale("https://example.com/a.png")
+    assert set(metrics.endpoints) == {"greeting", "vapor", "invert_greyscale"}, sorted(metrics.endpoints)
+    assert metrics.get("greeting").cache_hits == 1
+    assert seen == ["greeting", "vapor", "invert_greyscale"], seen
+
+async def check_cache_ttls_keyed_by_endpoint_name():
+    # ttls are keyed by the method name, even where the path ends
+    # differently, e.g. vapor is /text/vaporwave.
+    with tempfile.TemporaryDirectory() as directory:
+        for cache in (idioticapi.MemoryCache(ttls={"vapor": 0.05, "greeting": 0.05}),
+                      idioticapi.DiskCache(directory, ttls={"vapor": 0.05, "greeting": 0.05})):
+            async with StandInServer() as server:
+                async with client_for(server, dev=True, cache=cache) as client:
+                    greeting = ("welcome", "gearz", False, "https://example.com/a.png", "someone", "0001", "Idiots", 10)
+                    for _ in range(2):
+                        await client.vapor("hello")
+                        await client.greeting(*greeting)
+                    assert server.requests == 2, server.requests
+                    await asyncio.sleep(0.06)
+                    await client.vapor("hello")
+                    await client.greeting(*greeting)
+                    assert server.requests == 4, (cache, server.requests)
+
+async def check_overlay_templates_only_for_overlays():
+    # A template named after a generator doesn't turn it into an
+    # overlay, only /overlays/ endpoints are rendered from templates.
+    from PIL import Image
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("blame", "approved"):
+            Image.new("RGBA", (8, 8), (255, 0, 0, 128)).save(os.path.join(directory, name + ".png"))
+        avatar = io.BytesIO()
+        Image.new("RGBA", (8, 8), (0, 0, 255, 255)).save(avatar, "PNG")
+        async with StandInServer() as server:
+            async with client_for(server, dev=True, local_effects=True, assets=directory) as client:
+                assert len(await client.blame("someone")) == server.image_size
+                assert server.requests == 1
+                approved = await client.approved(avatar.getvalue())
+                assert approved.startswith(b"\x89PNG") and server.requests == 1
+
+async def check_template_resizes_bounded():
+    # Avatars of every size get their own resize of a template, only
+    # the latest few may be kept or a long running bot keeps growing.
+    from PIL import Image
+    from idioticapi import render
+    with tempfile.TemporaryDirectory() as directory:
+        Image.new("RGBA", (8, 8), (255, 0, 0, 128)).save(os.path.join(directory, "approved.png"))
+        templates = render.Templates(directory, max_sized=4)
+        for size in range(1, 50):
+            avatar = io.BytesIO()
+            Image.new("RGBA", (size, size)).save(avatar, "PNG")
+            render.overlay(templates, "approved", avatar.getvalue())
+        assert len(templates._sized) == 4, len(templates._sized)
+        assert templates.get("approved", (49, 49)) is templates.get("approved", (49, 49))
+
+def main():
+    checks = [(name, func) for name, func in sorted(globals().items()) if name.startswith("check_")]
+    loop = asyncio.get_event_loop()
+    failed = 0
+    for name, func in checks:
+        start = time.perf_counter()
+        try:
+            loop.run_until_complete(func())
+        except Exception:
+            failed += 1
+            print("FAIL {}".format(name))
+            traceback.print_exc()
+        else:
+            print("ok   {} ({:.0f} ms)".format(name, (time.perf_counter() - start) * 1000))
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+'''A local stand-in for the API, used by the benchmarks.
+
+Images are served in the same `{"type": "Buffer", "data": [...]}`
+shape as the real API and text endpoints answer `{"text": ...}`.
+Latency, server errors and 429s can be injected, and images can be
+served as raw bytes and bodies gzipped like a mirror might.
+'''
+
+import asyncio
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import ssl
+import threading
+
+from aiohttp import web
+
+class StandInServer:
+    '''A local aiohttp server answering like the API.
+
+    image_size (int): Size in bytes of the images returned.
+    delay (float): Seconds to wait before answering each request.
+    certificate (tuple): A (certfile, keyfile) pair to serve https with,
+    see certs.py. Defaults to plain http.
+    image_sizes (dict): Image sizes by endpoint name, e.g. {"triggered":
+    2 * 1024 * 1024}, for endpoints that differ from image_size.
+    jitter (float): Extra random delay of up to this many seconds.
+    error_rate (float): Share of requests answered 500.
+    rate_limit (float): Requests per second allowed before answering 429
+    with a Retry-After, None for no limit.
+    seed (int): Seed of the random errors and jitter.
+    raw (bool): Answer images as image/png bytes to clients accepting
+    them, instead of the JSON array.
+    compress (bool): Gzip bodies for clients accepting it.
+    image_data (dict): Encoded images to serve by endpoint name, e.g.
+    {"triggered": gif_bytes}, instead of random bytes.
+    '''
+
+    def __init__(self, image_size=32 * 1024, delay=0.0, certificate=None, image_sizes=None,
+                 jitter=0.0, error_rate=0.0, rate_limit=None, seed=0, raw=False, compress=False,
+                 image_data=None):
+        self.image_size = image_size
+        self.image_sizes = image_sizes or {}
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.raw = raw
+        self.compress = compress
+        self.image_data = image_data or {}
+        self.sent_bytes = 0
+        self.certificate = certificate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.limited = 0
+        self._allowance = None
+        self._checked = None
+        self.url = None
+        self._runner = None
+        self._bodies = {}
+        self._images = {}
+        self._gzipped = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def image_bytes(self, size):
+        '''Return the raw bytes of the image of `size` bytes.'''
+
+        image = self._images.get(size)
+        if image is None:
+            image = self._images[size] = os.urandom(size)
+        return image
+
+    def image_body(self, size):
+        '''Return the encoded JSON body of an image of `size` bytes.'''
+
+        body = self._bodies.get(size)
+        if body is None:
+            data = list(self.image_bytes(size))
+            body = json.dumps({"type": "Buffer", "data": data}, separators=(",", ":")).encode("utf-8")
+            self._bodies[size] = body
+        return body
+
+    def respond(self, request, body, content_type):
+        '''Build a response, gzipped when enabled and accepted.'''
+
+        headers = {}
+        if self.compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+            # Images are the same few bodies over and over, compress each once.
+            compressed = self._gzipped.get(id(body))
+            if compressed is None or compressed[0] is not body:
+                compressed = (body, gzip.compress(body, 6))
+                if len(body) > 4096:
+                    self._gzipped[id(body)] = compressed
+            body = compressed[1]
+            headers["Content-Encoding"] = "gzip"
+        self.sent_bytes += len(body)
+        return web.Response(body=body, content_type=content_type, headers=headers)
+
+    async def answer(self):
+        '''Wait and return an injected error response, or None to answer normally.'''
+
+        self.requests += 1
+        delay = self.delay + (self.random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rate_limit is not None:
+            now = asyncio.get_event_loop().time()
+            if self._checked is None:
+                self._allowance, self._checked = self.rate_limit, now
+            self._allowance = min(self.rate_limit, self._allowance + (now - self._checked) * self.rate_limit)
+            self._checked = now
+            if self._allowance < 1:
+                self.limited += 1
+                retry_after = (1 - self._allowance) / self.rate_limit
+                return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "{:.3f}".format(retry_after)})
+            self._allowance -= 1
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": "internal"}, status=500)
+        return None
+
+    async def image(self, request):
+        error = await self.answer()
+        if error is not None:
+            return error
+        if request.method == "HEAD":
+            return web.Response()
+        name = request.path.rsplit("/", 1)[-1]
+        if name in self.image_data:
+            data = self.image_data[name]
+            if self.raw and "image/" in request.headers.get("Accept", ""):
+                return self.respond(request, data, "application/octet-stream")
+            body = json.dumps({"type": "Buffer", "data": list(data)}, separators=(",", ":")).encode("utf-8")
+            return self.respond(request, body, "application/json")
+        size = self.image_sizes.get(name, self.image_size)
+        if self.raw and "image/" in request.headers.get("Accept", ""):
+            return self.respond(request, self.image_bytes(size), "image/png")
+        return self.respond(request, self.image_body(size), "application/json")
+
+    async def text(self, request):
+        error = await self.answer()
+        if error is not None:
+            return error
+        body = json.dumps({"text": request.query.get("text", "")}).encode("utf-8")
+        return self.respond(request, body, "application/json")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/text/{name}", self.text)
+        app.router.add_route("*", "/{tail:.*}", self.image)
+        context = None
+        if self.certificate is not None:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(*self.certificate)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=context)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = "{}://127.0.0.1:{}".format("https" if context else "http", port)
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+class ServerThread:
+    '''Runs a StandInServer on its own event loop in a background thread.
+
+    Keeps the server's work off the loop the Client being measured
+    runs on. Use as a context manager, `url` is set once entered.
+    '''
+
+    def __init__(self, server):
+        self.server = server
+        self.loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return self.server.url
+
+    def __enter__(self):
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.server.start())
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.server.stop())
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+class ServerProcess:
+    '''Runs a StandInServer in a child process.
+
+    For measuring the memory of the Client, the server's allocations
+    would be counted with it in a thread. The server's counters stay
+    in the child. Use as a context manager, `url` is set once entered.
+    '''
+
+    def __init__(self, server):
+        self.server = server
+        self.url = None
+        self._process = None
+
+    def __enter__(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=self._run, args=(child,), daemon=True)
+        self._process.start()
+        self.url = parent.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+    def _run(self, pipe):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(self.server.start())
+        pipe.send(self.server.url)
+        loop.run_forever()
@@ -0,0 +1,250 @@
+'''Benchmark suite of the Client against the stand-in API.
+
+Runs each scenario against its own StandInServer and prints the
+results as JSON, so runs of different releases can be compared:
+
+    single      sequential calls, per call latency
+    throughput  many calls through Client.map, requests per second
+    large_gif   an 8 MB image, read whole and streamed to a file
+    burst       a burst of calls into a rate limited, failing server
+
+Run from the repository root:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare results.json
+
+Each scenario runs --repeat times against a fresh server and the
+median of every number is kept. --compare prints how the latency,
+throughput and memory numbers in COMPARED moved against an earlier run
+and exits with 1 when one got worse by more than --tolerance. Counts
+such as calls or the server's 429s are reported but not compared, and
+quick runs are only compared with quick runs.
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import idioticapi
+from idioticapi import decoder
+from server import ServerProcess, ServerThread, StandInServer
+
+# Results where a bigger number is better, every other one is better smaller.
+HIGHER_IS_BETTER = {"requests_per_second"}
+
+# The results compared by --compare: latency, throughput and memory.
+# Tail percentiles of a few hundred calls are mostly noise, and the
+# burst's timings depend on how the adaptive rate limiter meets the
+# server's limit, they swing by a third between identical runs. The
+# large GIF's timings are mostly loopback copying that the server
+# shares a CPU with, only its memory peaks are steady. Those are
+# reported but not compared.
+COMPARED = {
+    "single": {"p50_ms", "mean_ms"},
+    "throughput": {"requests_per_second"},
+    "large_gif": {"read_peak_mb", "stream_peak_mb"},
+    "burst": set()
+}
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def latencies(values):
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3)
+    }
+
+def client_for(server, **options):
+    client = idioticapi.Client("token", **options)
+    client.base_url = server.url
+    return client
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+# --------------------
+# |    Scenarios     |
+# --------------------
+
+async def single(server, calls):
+    client = client_for(server)
+    try:
+        await client.warmup()
+        took = []
+        for i in range(calls):
+            took.append(await timed(client.triggered("https://example.com/{}.png".format(i))))
+    finally:
+        await client.close()
+    return dict(latencies(took), calls=calls)
+
+async def throughput(server, calls, concurrency=32):
+    client = client_for(server)
+    urls = ["https://example.com/{}.png".format(i) for i in range(calls)]
+    try:
+        await client.warmup(concurrency)
+        start = time.perf_counter()
+        failed = 0
+        async for result in client.map("triggered", urls, concurrency):
+            failed += not result.ok
+        took = time.perf_counter() - start
+    finally:
+        await client.close()
+    return {"calls": calls, "concurrency": concurrency, "failed": failed,
+            "seconds": round(took, 3), "requests_per_second": round(calls / took, 1)}
+
+async def large_gif(server, calls=3):
+    # The server runs in a ServerProcess here, so only the Client's memory is traced.
+    # Tracing slows the Client down, so times and peaks are measured on separate calls.
+    client = client_for(server)
+    url = "https://example.com/big.gif"
+    results = {}
+    try:
+        await client.warmup()
+        took = [await timed(client.triggered(url)) for _ in range(calls)]
+        results["read_ms"] = round(statistics.median(took) * 1000, 1)
+        tracemalloc.start()
+        await client.triggered(url)
+        results["read_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+        tracemalloc.stop()
+
+        with tempfile.TemporaryFile() as f:
+            took = []
+            for _ in range(calls):
+                f.seek(0)
+                took.append(await timed(client.stream("triggered", url, into=f)))
+            results["stream_ms"] = round(statistics.median(took) * 1000, 1)
+            f.seek(0)
+            tracemalloc.start()
+            await client.stream("triggered", url, into=f)
+            results["stream_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            tracemalloc.stop()
+    finally:
+        await client.close()
+    return results
+
+async def burst(server, calls):
+    client = client_for(
+        server,
+        ratelimiter=idioticapi.RateLimiter(rate=200),
+        retry=idioticapi.RetryPolicy(attempts=5, base=0.05, cap=1)
+    )
+    took = []
+
+    async def call(i):
+        start = time.perf_counter()
+        try:
+            await client.triggered("https://example.com/{}.png".format(i))
+            return True
+        except idioticapi.IdioticError:
+            return False
+        finally:
+            took.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        succeeded = sum(await asyncio.gather(*[call(i) for i in range(calls)]))
+        seconds = time.perf_counter() - start
+    finally:
+        await client.close()
+    return dict(latencies(took), calls=calls, succeeded=succeeded, seconds=round(seconds, 3),
+                server_429s=server.limited, server_errors=server.errors, retries=client.retry.retries)
+
+def run(quick=False, repeat=5):
+    scale = 0.2 if quick else 1
+    scenarios = [
+        ("single", StandInServer, {}, lambda s: single(s, int(300 * scale))),
+        ("throughput", StandInServer, {"delay": 0.005, "jitter": 0.005}, lambda s: throughput(s, int(2000 * scale))),
+        ("large_gif", StandInServer, {"image_sizes": {"triggered": 8 * 1024 * 1024}}, large_gif),
+        ("burst", StandInServer, {"delay": 0.002, "error_rate": 0.05, "rate_limit": 150}, lambda s: burst(s, int(500 * scale)))
+    ]
+    loop = asyncio.get_event_loop()
+    results = {}
+    for name, make, options, scenario in scenarios:
+        runs = []
+        for _ in range(repeat):
+            server = make(**options)
+            for size in set(server.image_sizes.values()) | {server.image_size}:
+                server.image_body(size)
+            runner = ServerProcess(server) if name == "large_gif" else ServerThread(server)
+            with runner:
+                runs.append(loop.run_until_complete(scenario(runner if name == "large_gif" else server)))
+        results[name] = {key: median([run[key] for run in runs]) for key in runs[0]}
+    return {
+        "meta": {
+            "version": idioticapi.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": decoder.BACKEND,
+            "quick": quick,
+            "repeat": repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "results": results
+    }
+
+def median(values):
+    value = statistics.median(values)
+    return round(value, 3) if isinstance(value, float) else value
+
+def compare(old, new, tolerance):
+    '''Print how every result moved, return how many got worse by more than tolerance.'''
+
+    worse = 0
+    for scenario, values in new["results"].items():
+        for key, value in values.items():
+            before = old["results"].get(scenario, {}).get(key)
+            if key not in COMPARED.get(scenario, ()) or not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            change = (value - before) / before
+            regressed = -change > tolerance if key in HIGHER_IS_BETTER else change > tolerance
+            worse += regressed
+            print("{:<11} {:<20} {:>12} -> {:<12} {:>+7.1%}{}".format(
+                scenario, key, before, value, change, "  REGRESSION" if regressed else ""))
+    return worse
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Client against a local stand-in API.")
+    parser.add_argument("--output", help="write the results to this file")
+    parser.add_argument("--compare", help="compare against results written earlier")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed change before a regression, default 0.25")
+    parser.add_argument("--quick", action="store_true", help="fewer calls per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each scenario, medians are kept, default 5")
+    options = parser.parse_args()
+
+    old = None
+    if options.compare:
+        with open(options.compare) as f:
+            old = json.load(f)
+        if old["meta"].get("quick") != options.quick:
+            sys.exit("Can't compare {} results with {} ones, run with{} --quick".format(
+                "quick" if old["meta"].get("quick") else "full", "quick" if options.quick else "full",
+                "" if old["meta"].get("quick") else "out"))
+
+    results = run(options.quick, options.repeat)
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if old is not None:
+        if compare(old, results, options.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+'''Check the local text transforms against a snapshot of their outputs.
+
+Compares idioticapi.transforms with the outputs kept in
+fixtures/text.json. Run from the repository root:
+
+    python benchmarks/text_snapshot.py
+
+The outputs in the file were generated by the transforms themselves
+(its "source" is "snapshot"), so this only catches changes to them,
+it says nothing about matching the API. To replace them with the
+outputs of the development API, which is where the text endpoints
+live, and check against those instead:
+
+    python benchmarks/text_snapshot.py --record YOUR_DEV_TOKEN
+
+owoify turns runs of ! into a random face, so the fixtures avoid !.
+'''
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import idioticapi
+from idioticapi.transforms import TRANSFORMS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "text.json")
+
+def load():
+    with open(FIXTURES, encoding="utf-8") as f:
+        return json.load(f)
+
+async def record(token):
+    fixtures = load()
+    cases = fixtures["cases"]
+    client = idioticapi.Client(token, dev=True)
+    try:
+        for case in cases:
+            case["expected"] = await client.request(case["endpoint"], *case["args"])
+    finally:
+        await client.close()
+    fixtures["source"] = "api"
+    with open(FIXTURES, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print("Recorded {} cases".format(len(cases)))
+
+def check():
+    failed = 0
+    fixtures = load()
+    cases = fixtures["cases"]
+    for case in cases:
+        got = TRANSFORMS[case["endpoint"]](*case["args"])
+        if got != case["expected"]:
+            failed += 1
+            print("FAIL {}{!r}\n  expected {!r}\n  got      {!r}".format(
+                case["endpoint"], tuple(case["args"]), case["expected"], got))
+    against = "the API" if fixtures["source"] == "api" else "the snapshot, not recorded from the API"
+    print("{} of {} cases match {}".format(len(cases) - failed, len(cases), against))
+    return failed
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--record":
+        asyncio.get_event_loop().run_until_complete(record(sys.argv[2]))
+        return
+    sys.exit(1 if check() else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
-import aiohttp
-import urllib.parse
 import asyncio
-
-def br_invalid(br):
-    try:
-        if br >= 0 and br <= 255:
-            return False
-        else:
-            return True
-    except:
-        return True
+import concurrent.futures
+import copy
+import functools
+import time
+
+from .batch import BatchIterator, gather_batch
+from .cache import DiskCache, endpoint_name, make_key
+from . import effects, render
+from .backends import DEV_URL, PROD_URL, Backends
+from .decoder import StreamDecoder, decode_image, is_raw, loads
+from .endpoints import ALIASES, ENDPOINTS, Route, Target, br_invalid
+from .errors import HTTPException, IdioticError, InvalidParam, NotAvailable, RateLimited
+from .scheduler import priority_value
+from .singleflight import SingleFlight
+from .stream import StreamIterator, make_sink
+from .transforms import TRANSFORMS
+
+def failover_errors():
+    '''Return the errors that move a request on to the next backend.'''
+
+    import aiohttp
+    return (aiohttp.ClientConnectionError, asyncio.TimeoutError)
 
 # --------------------
 # |     Classes      |
@@ -21,9 +32,17 @@ class Client:
     An object that represents the client to connect to
     the API. With the Client object you can request any
     of the API's endpoints.
+
+    Use it as `async with Client(...) as client:`, or call
+    `await client.close()` when done with it.
     '''
 
-    def __init__(self, token, dev=False):
+    def __init__(self, token, dev=False, cache=None, limit=100, limit_per_host=0,
+                 keepalive_timeout=30, ttl_dns_cache=300, ratelimiter=None, retry=None,
+                 local_text=False, local_effects=False, executor=None,
+                 assets=None, decode_threshold=1 << 20, decode_executor=None, decode_workers=2,
+                 metrics=None, breaker=None, base_urls=None, session=None, transcoder=None,
+                 scheduler=None, priority="normal"):
         '''Constructs the Client.
 
         Constructs the Client to be used for requests.
@@ -37,16 +56,131 @@ class Client:
 
         session (aiohttp.ClientSession): You can pass a ClientSession
         for the Client to use, if not, the Client will create its own
-        session. Defaults to aiohttp.ClientSession.
+        session when the first request is made, in the loop it is
+        made from. A session passed in is not closed by close().
+        Defaults to None.
+
+        cache (MemoryCache): A cache to keep results in, so repeated
+        requests don't go to the API again. Defaults to None.
+
+        limit (int): How many connections the session keeps open
+        at most. 0 means no limit. Defaults to 100.
+
+        limit_per_host (int): How many of those may go to the same
+        host. 0 means no limit. Defaults to 0.
+
+        keepalive_timeout (float): Seconds an idle connection is kept
+        open for reuse. Defaults to 30.
+
+        ttl_dns_cache (float): Seconds DNS lookups are cached for.
+        Defaults to 300.
+
+        ratelimiter (RateLimiter): Spaces out requests and waits out
+        429 responses instead of failing. Defaults to None.
+
+        retry (RetryPolicy): Retries requests that failed with a
+        server error, a broken connection or a timeout. Defaults
+        to None.
+
+        local_text (bool): Run owoify, mock, tiny, cursive and vapor
+        locally instead of requesting them. They are then available
+        in production too, where the API refuses them. The local
+        transforms were not checked against the API's outputs, so
+        their results may differ from it. Defaults to False.
+
+        local_effects (bool): Run the pixel effects (greyscale, invert,
+        invert_greyscale, sepia, silhouette, threshold, invert_threshold,
+        brightness and darkness) locally with NumPy and Pillow, see
+        `pip install idioticapi[effects]`. The avatar can then be given
+        as image bytes too. colour swatches are then made locally as
+        well, and so are the overlays that have a template in `assets`.
+        Defaults to False.
+
+        executor (concurrent.futures.Executor): Where local effects
+        and transcoding run, so they don't block the event loop.
+        Defaults to the loop's default thread pool.
+
+        assets (str): Directory of overlay templates for local_effects,
+        named after the endpoint, e.g. approved.png. They are loaded
+        once and kept in memory. Defaults to None.
+
+        decode_threshold (int): Image responses of at least this many
+        bytes are decoded in a worker pool instead of on the event
+        loop. None decodes everything inline. Results this large are
+        also written to a DiskCache from the executor. Defaults to 1 MiB.
+
+        decode_executor (concurrent.futures.Executor): The pool large
+        responses are decoded in, e.g. a ProcessPoolExecutor to keep
+        them off the interpreter entirely. Defaults to a thread pool
+        of `decode_workers` threads, created when first needed.
+
+        metrics (Metrics): Collects request counts, latencies, bytes,
+        status codes and retry, cache and deduplication counters per
+        endpoint. Defaults to None.
+
+        breaker (CircuitBreaker): Makes requests to a failing group of
+        endpoints raise CircuitOpen at once instead of waiting on the
+        API, see `client.breaker.degraded`. Defaults to None.
+
+        base_urls (list): Servers to spread requests over, e.g. the API
+        and a mirror. Each is a url, a (url, dev) tuple or a Backend,
+        where dev says whether it serves the development paths. Each
+        request goes to the healthy one answering fastest, and moves
+        on to the next one on connection errors, see `client.backends`.
+        Defaults to the API matching `dev`.
+
+        transcoder (Transcoder): Re-encodes image results, e.g. as
+        WebP scaled down to a maximum size, before they are returned.
+        The transcoded result is cached next to the original. Defaults
+        to None.
+
+        scheduler (Scheduler): Bounds the requests sent at once and
+        sends waiting ones by priority. Defaults to None.
+
+        priority (str): Priority class of this Client's requests with
+        the scheduler, interactive, normal or background. See
+        `with_priority` for sending some requests at another one.
+        Defaults to normal.
+
+        Identical requests made while one is already running share
+        its result instead of calling the API again, see
+        `client.inflight.deduplicated` for how many were shared.
         '''
 
         self.token = token
         self.dev = dev
-        self.session = aiohttp.ClientSession(loop=asyncio.get_event_loop()) # Fixed the UserInputError.
-        self.headers = {
-          "Authorization" if self.dev else "token": self.token
+        self.connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": ttl_dns_cache
         }
-        self.base_url = "https://dev.anidiots.guide" if self.dev else "https://api.anidiots.guide"
+        self._session = session
+        self._owns_session = session is None
+        self._owns_decoder = False
+        self.backends = Backends(base_urls or [DEV_URL if self.dev else PROD_URL], self.dev, self.token)
+        self.headers = self.backends.primary.headers
+        self.cache = cache
+        self.inflight = SingleFlight()
+        self.ratelimiter = ratelimiter
+        self.retry = retry
+        self.local_text = local_text
+        if local_effects and not effects.AVAILABLE:
+            raise ImportError("local_effects needs numpy and Pillow, install them with pip install idioticapi[effects]")
+        self.local_effects = local_effects
+        self.executor = executor
+        self.templates = None if assets is None else render.Templates(assets)
+        self.decode_threshold = decode_threshold
+        self.decode_executor = decode_executor
+        self.decode_workers = decode_workers
+        self.metrics = metrics
+        self.breaker = breaker
+        self.transcoder = transcoder
+        self.scheduler = scheduler
+        self.priority = priority_value(priority)
+        self._routes = {}
+        # The Client the views from with_priority share a session with.
+        self._root = self
 
     def __repr__(self):
         '''Return a eval-safe string representation of the object.'''
@@ -58,29 +192,554 @@ class Client:
 
         return "<IdioticAPI Client, dev={}, url={}>".format(self.dev, self.base_url)
 
-    async def _get(self, endpoint, query):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def session(self):
+        '''The aiohttp.ClientSession requests go through.
+
+        Created on first use, in the running loop, unless one was
+        passed to the Client.
+        '''
+
+        root = self._root
+        if root._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(**root.connector_options)
+            root._session = aiohttp.ClientSession(connector=connector)
+        return root._session
+
+    async def close(self):
+        '''Close the session and the decode pool the Client made.
+
+        Sessions and executors passed in are left open. The Client
+        can still be used afterwards, it makes a new session.
+        '''
+
+        root = self._root
+        if root._owns_session and root._session is not None:
+            session, root._session = root._session, None
+            await session.close()
+        if root._owns_decoder:
+            root.decode_executor.shutdown(wait=False)
+            root.decode_executor = None
+            root._owns_decoder = False
+
+    @property
+    def base_url(self):
+        '''The url of the first backend, setting it replaces all of them.'''
+
+        return self.backends.primary.url
+
+    @base_url.setter
+    def base_url(self, url):
+        self.backends = Backends([url], self.dev, self.token)
+        self.headers = self.backends.primary.headers
+
+    async def warmup(self, connections=1):
+        '''Open connections to the API ahead of time.
+
+        Opens `connections` connections to every backend at once
+        and leaves them in the pool, so the first requests don't
+        have to wait for the TCP and TLS handshakes. Returns how
+        many connections were opened.
+
+        Params:
+
+        connections (int): How many connections to open.
+        '''
+
+        async def ping(backend):
+            async with self.session.get(backend.url, headers=backend.headers) as resp:
+                await resp.read()
+
+        pings = [ping(backend) for backend in self.backends for _ in range(connections)]
+        results = await asyncio.gather(*pings, return_exceptions=True)
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+    def with_priority(self, priority):
+        '''Return a view of the Client whose requests have `priority`.
+
+        The view shares the session, cache, scheduler and everything
+        else with this Client, e.g.
+        `await client.with_priority("background").greeting(...)`.
+        Identical requests of different priorities share one request,
+        sent at the priority of the first.
+
+        Params:
+
+        priority (str): interactive, normal or background.
+        '''
+
+        view = copy.copy(self)
+        view.priority = priority_value(priority)
+        return view
+
+    def route(self, name, dev=None):
+        '''Return the Route an endpoint is requested with.
+
+        Routes are built once per Client from the ENDPOINTS table.
+
+        Params:
+
+        name (str): The endpoint, e.g. "blame".
+        dev (bool): Route for the development paths or the production
+        ones. Defaults to the Client's.
+        '''
+
+        if dev is None:
+            dev = self.dev
+        route = self._routes.get((name, dev))
+        if route is None:
+            name = ALIASES.get(name, name)
+            if name not in ENDPOINTS:
+                raise ValueError("Unknown endpoint: {}".format(name))
+            route = self._routes[name, dev] = Route(ENDPOINTS[name], dev)
+        return route
+
+    async def request(self, name, *args, **kwargs):
+        '''Request any endpoint by name.
+
+        Takes the same arguments as the endpoint's method, e.g.
+        `await client.request("slap", slapper, slapped)`. Endpoints
+        only listed in ENDPOINTS can be requested this way too.
+
+        Params:
+
+        name (str): The endpoint, e.g. "blame".
+        '''
+
+        route = self._served(name)
+        if self.local_text and route.endpoint.name in TRANSFORMS:
+            return TRANSFORMS[route.endpoint.name](**route.bind(args, kwargs, local=True))
+        if self._renders(route.endpoint):
+            return await self._effect(route, route.bind(args, kwargs, local=True))
+        values = route.bind(args, kwargs)
+        path, query, pairs = route.build(values)
+        target = self._target(route, values, path + query)
+        key = make_key(self.base_url, path, pairs, route.endpoint.name)
+        if self.transcoder is not None and not route.endpoint.text and self.transcoder.applies(route.endpoint.name):
+            return await self._transcoded(path, key, target)
+        return await self._get(path, query, key, route.endpoint.text, target)
+
+    def map(self, method, args, concurrency=8, ordered=False):
+        '''Call an endpoint for many inputs, a few at a time.
+
+        Returns an async iterator of BatchResult objects, yielded as
+        the calls finish or in input order when `ordered` is True.
+        Inputs are only read from `args` when a call slot is free,
+        and a failed call is yielded with its error instead of
+        stopping the batch.
+
+        Params:
+
+        method (str or method): The endpoint, e.g. "wanted" or client.wanted.
+        args (iterable): Arguments for each call, an iterable or async
+        iterable. Tuples are passed as positional arguments, dicts as
+        keyword arguments, anything else as the only argument.
+        concurrency (int): How many calls run at once. Defaults to 8.
+        ordered (bool): Yield results in input order. Defaults to False.
+        '''
+
+        return BatchIterator(args, concurrency, ordered, func=self._method(method))
+
+    async def batch(self, calls, concurrency=8):
+        '''Run many endpoint calls, a few at a time.
+
+        Returns a list of BatchResult objects in the order of `calls`.
+        A failed call has its error set instead of stopping the batch.
+
+        Params:
+
+        calls (iterable): (method, args) pairs, e.g. ("wanted", avatar)
+        or (client.slap, (slapper, slapped)). Args are passed as in map.
+        concurrency (int): How many calls run at once. Defaults to 8.
+        '''
+
+        calls = ((self._method(method), args) for method, args in calls)
+        return await gather_batch(BatchIterator(calls, concurrency))
+
+    async def prerender_greetings(self, template, members, member_counts=(None,), concurrency=4, priority="background"):
+        '''Render greeting cards ahead of time, into the cache.
+
+        Renders the card of every member at every member count, so
+        greet() only has to look them up, e.g. the next 10 counts
+        of a member about to join:
+        `await client.prerender_greetings(template, [member], range(count + 1, count + 11))`.
+        Cards already in the cache are not rendered again. Returns a
+        list of BatchResult objects, one per card.
+
+        Params:
+
+        template (GreetingTemplate): The guild's greeting.
+        members (iterable): Member objects.
+        member_counts (iterable): Member counts to render each card at.
+        concurrency (int): How many cards render at once. Defaults to 4.
+        priority (str): Priority class of the requests with a scheduler.
+        Defaults to background.
+        '''
+
+        if self.cache is None:
+            raise ValueError("prerender_greetings needs a cache to keep the cards in")
+        client = self.with_priority(priority)
+        return await client.batch(template.calls(members, member_counts), concurrency)
+
+    async def greet(self, template, member, member_count=None):
+        '''Return the greeting card of a member, from the cache when it was prerendered.
+
+        Params:
+
+        template (GreetingTemplate): The guild's greeting.
+        member (Member): Who joined or left.
+        member_count (int): The member count on the card.
+        '''
+
+        name, kwargs = template.call(member, member_count)
+        return await self.request(name, **kwargs)
+
+    async def stream(self, method, *args, into, chunk_size=64 * 1024, **kwargs):
+        '''Download an image straight into a file or buffer.
+
+        Decodes the image as it arrives and writes it to `into`
+        chunk by chunk, so memory use stays around `chunk_size`
+        however big the image is. Returns how many bytes were
+        written. Results are served from the cache when it has
+        them, but streamed images are not added to it.
+
+        Params:
+
+        method (str or method): The endpoint, e.g. "triggered".
+        into: A file opened in binary mode, an io.BytesIO, anything
+        else with a write method, or a preallocated bytearray.
+        chunk_size (int): How many bytes to read at a time.
+
+        Other arguments are passed on as to the endpoint method,
+        e.g. `await client.stream("triggered", avatar, into=f)`.
+        '''
+
+        sink = make_sink(into)
+        written = [0]
+
+        async def count(chunk):
+            written[0] += len(chunk)
+            await sink(chunk)
+
+        await self._stream(method, args, kwargs, count, chunk_size)
+        return written[0]
+
+    def iter_stream(self, method, *args, chunk_size=64 * 1024, **kwargs):
+        '''Download an image as an async iterator of chunks.
+
+        Like stream, but yields the decoded bytes as they arrive:
+        `async for chunk in client.iter_stream("triggered", avatar)`.
+        '''
+
+        async def start(sink):
+            await self._stream(method, args, kwargs, sink, chunk_size)
+
+        return StreamIterator(start)
+
+    def _method(self, method):
+        '''Return the callable for an endpoint given by name or method.'''
+
+        if not isinstance(method, str):
+            return method
+        if hasattr(self, method):
+            return getattr(self, method)
+        return functools.partial(self.request, method)
+
+    async def _stream(self, method, args, kwargs, sink, chunk_size):
+        route = self._served(method if isinstance(method, str) else method.__name__)
+        if route.endpoint.text:
+            raise TypeError("Text endpoints can't be streamed")
+        if self._renders(route.endpoint):
+            await sink(await self._effect(route, route.bind(args, kwargs, local=True)))
+            return
+        values = route.bind(args, kwargs)
+        endpoint, query, pairs = route.build(values)
+        cached = self._cached(route.endpoint.name, make_key(self.base_url, endpoint, pairs, route.endpoint.name))
+        if cached is not None:
+            await sink(cached)
+            return
+
+        async def read(resp):
+            if is_raw(resp.content_type):
+                while True:
+                    chunk = await resp.content.read(chunk_size)
+                    if not chunk:
+                        break
+                    await sink(chunk)
+                return
+            decoder = StreamDecoder()
+            while True:
+                chunk = await resp.content.read(chunk_size)
+                if not chunk:
+                    break
+                data = decoder.feed(chunk)
+                if data:
+                    await sink(data)
+            decoder.close()
+
+        await self._request(endpoint, self._target(route, values, endpoint + query), handler=read)
+
+    def _served(self, name):
+        '''Return the Route of an endpoint for the primary backend.
+
+        An endpoint the primary doesn't serve, e.g. a development only
+        one behind a production primary, is routed for the other
+        backends instead when one of them serves it.
+        '''
+
+        route = self.route(name)
+        if route.path is None and any(backend.dev != route.dev for backend in self.backends):
+            return self.route(name, not route.dev)
+        return route
+
+    def _target(self, route, values, path):
+        '''Return the Target of a call built for the Client's own paths.'''
+
+        target = Target(functools.partial(self.route, route.endpoint.name), values, name=route.endpoint.name)
+        target.paths[route.dev] = path
+        return target
+
+    def _renders(self, endpoint):
+        '''Whether an endpoint is rendered locally.'''
+
+        if not self.local_effects:
+            return False
+        if endpoint.name in effects.EFFECTS or endpoint.name == "colour":
+            return True
+        return self.templates is not None and endpoint.dev_path.startswith("/overlays/") and endpoint.name in self.templates
+
+    async def _effect(self, route, values):
+        '''Render an endpoint locally, downloading the avatar when given a url.'''
+
+        name = route.endpoint.name
+        if name == "colour":
+            return render.swatch(values["colour"])
+        if isinstance(values["avatar"], (bytes, bytearray, memoryview)):
+            return await self._apply(name, bytes(values["avatar"]), values)
+        pairs = route.build(values)[2]
+        key = make_key("local", route.endpoint.dev_path, pairs, route.endpoint.name)
+        cached = self._cached(name, key)
+        if cached is not None:
+            return cached
+        self._joining(name, key)
+        return await self.inflight.do(key, self._fetch_effect, key, name, dict(pairs)["avatar"], values)
+
+    async def _fetch_effect(self, key, name, url, values):
+        async with self.session.get(url) as resp:
+            if resp.status != 200:
+                raise HTTPException(resp.status, "Could not download the avatar, got a {} code".format(resp.status))
+            data = await resp.read()
+        result = await self._apply(name, data, values)
+        await self._store(key, result)
+        return result
+
+    async def _apply(self, name, data, values):
+        loop = asyncio.get_event_loop()
+        if name in effects.EFFECTS:
+            return await loop.run_in_executor(self.executor, effects.apply, name, data, values)
+        return await loop.run_in_executor(self.executor, render.overlay, self.templates, name, data)
+
+    async def _get(self, endpoint, query, key=None, text=False, target=None):
         '''Request the actual return from the API.
 
         Request the actual return from the API. Should
         never be called directly.
         '''
 
-        async with self.session.get("{}{}{}".format(self.base_url, endpoint, query.replace('webp', 'png')), headers=self.headers) as resp:
-            if resp.status != 200:
-                raise Exception("API Returned a non 200 code: {}".format(resp.status))
-            data = await resp.json()
-        return bytes(data["data"])
-
-    async def _text(self, endpoint, text, style=None):
-        """Helper function for text endpoints."""
-        params = { "text": text }
-        if style: params["style"] = style
-        async with self.session.get("{}/text/{}".format(self.base_url, endpoint), headers=self.headers, params=params) as resp:
-            # TODO, use params for all querystrings instead?
-            if resp.status != 200:
-                raise Exception("API Returned a non 200 code: {}".format(resp.status))
-            data = await resp.json()
-            return data["text"]
+        if key is None:
+            key = make_key(self.base_url, endpoint, query)
+        if target is None:
+            target = Target(path=endpoint + query, name=endpoint_name(endpoint))
+        cached = self._cached(target.name, key)
+        if cached is not None:
+            return cached
+        self._joining(target.name, key)
+        return await self.inflight.do(key, self._fetch, key, endpoint, target, text)
+
+    async def _transcoded(self, endpoint, key, target):
+        '''Return the transcoded variant of a result, from the cache when it has it.'''
+
+        variant = self.transcoder.key(key)
+        cached = self._cached(target.name, variant)
+        if cached is not None:
+            return cached
+        self._joining(target.name, variant)
+        return await self.inflight.do(variant, self._transcode, variant, endpoint, key, target)
+
+    async def _transcode(self, variant, endpoint, key, target):
+        original = await self._get(endpoint, "", key, False, target)
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(self.executor, self.transcoder.transcode, original)
+        await self._store(variant, result)
+        return result
+
+    async def _store(self, key, result):
+        '''Put a result in the cache, writing large ones to disk from the executor.'''
+
+        if self.cache is None:
+            return
+        if isinstance(self.cache, DiskCache) and self.decode_threshold is not None and len(result) >= self.decode_threshold:
+            await asyncio.get_event_loop().run_in_executor(self.executor, self.cache.set, key, result)
+        else:
+            self.cache.set(key, result)
+
+    def _cached(self, name, key):
+        '''Return the cached result of a key of the endpoint `name`, or None.'''
+
+        if self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        if self.metrics is not None:
+            stats = self.metrics.get(name)
+            if cached is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        return cached
+
+    def _joining(self, name, key):
+        '''Count a call that will share an identical running request.'''
+
+        if self.metrics is not None and key in self.inflight:
+            self.metrics.get(name).deduplicated += 1
+
+    async def _fetch(self, key, endpoint, target, text):
+        content_type, body = await self._request(endpoint, target)
+        if text:
+            result = loads(body)["text"]
+        elif is_raw(content_type):
+            result = body
+        else:
+            result = await self._decode(body)
+        await self._store(key, result)
+        return result
+
+    async def _decode(self, body):
+        '''Decode an image body, in the decode pool when it is large.'''
+
+        if self.decode_threshold is None or len(body) < self.decode_threshold:
+            return decode_image(body)
+        root = self._root
+        if root.decode_executor is None:
+            root.decode_executor = concurrent.futures.ThreadPoolExecutor(root.decode_workers)
+            root._owns_decoder = True
+        return await asyncio.get_event_loop().run_in_executor(root.decode_executor, decode_image, body)
+
+    async def _request(self, endpoint, target, handler=None):
+        '''Make a request to the API and return its (content type, body).
+
+        Waits for a slot of the scheduler when one is set, then
+        goes through the rate limiter when one is set, requests
+        answered 429 are queued again until it gives up. Each
+        attempt goes to the backend `client.backends` picks, a
+        connection error moves on to the next one at once while
+        there is one left. Failures are retried as the retry policy
+        allows, the number of retries made is set as `retries` on
+        the error raised. The circuit breaker lets the request
+        through once and records only how its last attempt ended.
+
+        With a `handler`, it is awaited with the successful response
+        instead of reading the body, and the request is not retried
+        once the handler has started.
+        '''
+
+        handling = False
+        limited = 0
+        retries = 0
+        started = time.monotonic()
+        metrics = self.metrics
+        breaker = self.breaker
+        backends = self.backends
+        scheduler = self.scheduler
+        tried = set()
+        # The breaker lets the whole request through once and hears
+        # how it ended once, attempts another backend recovered from
+        # or that got a 429 are not its outcome.
+        admitted = False
+        status = failure = None
+        sent = started
+        try:
+            while True:
+                if scheduler is not None:
+                    await scheduler.acquire(self.priority, started)
+                try:
+                    if self.ratelimiter is not None:
+                        await self.ratelimiter.acquire(target.name)
+                    if breaker is not None and not admitted:
+                        breaker.before(endpoint)
+                        admitted = True
+                    backend = backends.choose(target.usable, tried)
+                    url = target.url(backend)
+                    if metrics is not None:
+                        measured = metrics.start(target.name, url, backend.headers)
+                except BaseException:
+                    if scheduler is not None:
+                        scheduler.release()
+                    raise
+                resp = status = failure = None
+                backend.inflight += 1
+                sent = time.monotonic()
+                try:
+                    async with self.session.get(url, headers=backend.headers) as resp:
+                        status = resp.status
+                        if resp.status >= 500:
+                            backends.failed(backend)
+                        else:
+                            backends.succeeded(backend, time.monotonic() - sent)
+                        if self.ratelimiter is not None:
+                            retry_after = self.ratelimiter.update(target.name, resp.status, resp.headers)
+                            if resp.status == 429:
+                                if limited >= self.ratelimiter.max_retries:
+                                    raise RateLimited(retry_after=retry_after)
+                                limited += 1
+                                continue
+                        if resp.status == 200:
+                            if handler is None:
+                                return resp.content_type, await resp.read()
+                            handling = True
+                            return await handler(resp)
+                        error = HTTPException(resp.status)
+                except Exception as exc:
+                    failure = exc
+                    if resp is None and isinstance(exc, failover_errors()):
+                        backends.failed(backend)
+                        tried.add(backend)
+                        if backends.choose(target.usable, tried) not in tried:
+                            continue
+                    if self.retry is None or handling:
+                        raise
+                    error = exc
+                finally:
+                    if scheduler is not None:
+                        scheduler.release()
+                    backend.inflight -= 1
+                    if metrics is not None:
+                        if resp is None:
+                            metrics.end(measured, None, 0, failure)
+                        else:
+                            size = resp.content_length
+                            if size is None:
+                                size = resp.content.total_bytes
+                            metrics.end(measured, resp.status, size, failure)
+                delay = None if self.retry is None else self.retry.delay(error, retries, started)
+                if delay is None:
+                    error.retries = retries
+                    raise error
+                if metrics is not None:
+                    metrics.get(target.name).retries += 1
+                await asyncio.sleep(delay)
+                retries += 1
+                tried.clear()
+        finally:
+            if admitted:
+                breaker.record(endpoint, status, failure, time.monotonic() - sent)
 
     async def blame(self, name):
         '''Returns a blame image in byte form.
@@ -93,7 +752,7 @@ class Client:
         name (str): Name to be displayed in the image.
         '''
 
-        return await self._get("/generators/blame" if self.dev else "/blame", "?name={}".format(name))
+        return await self.request("blame", name)
 
     async def triggered(self, avatar):
         '''Returns a triggered image in byte form.
@@ -106,7 +765,7 @@ class Client:
         avatar (str): Link to image to be filtered.
         '''
 
-        return await self._get("/generators/triggered" if self.dev else "/triggered", "?avatar={}".format(avatar))
+        return await self.request("triggered", avatar)
 
     async def wanted(self, avatar):
         '''Returns a wanted image in byte form.
@@ -119,7 +778,7 @@ class Client:
         avatar (str): Link to image to be filtered.
         '''
 
-        return await self._get("/generators/wanted" if self.dev else "/wanted", "?avatar={}".format(avatar))
+        return await self.request("wanted", avatar)
 
     async def missing(self, avatar, text):
         '''Returns a missing image in byte form.
@@ -133,9 +792,7 @@ class Client:
         text (str): Text to be written on the image.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Missing endpoint is disabled while in production")
-        return await self._get("/generators/missing", "?avatar={}&text={}".format(avatar, text))
+        return await self.request("missing", avatar, text)
 
     async def pls(self, name):
         '''Returns a pls image in byte form.
@@ -148,7 +805,7 @@ class Client:
         name (str): Text to be written on the image.
         '''
 
-        return await self._get("/generators/pls" if self.dev else "/pls", "?name={}".format(name))
+        return await self.request("pls", name)
 
     async def snapchat(self, text):
         '''Returns a snapchat image in byte form.
@@ -161,7 +818,7 @@ class Client:
         text (str): Text to be written on the image.
         '''
 
-        return await self._get("/generators/snapchat" if self.dev else "/snapchat", "?text={}".format(text))
+        return await self.request("snapchat", text)
 
     async def achievement(self, avatar, text):
         '''Returns a achievement image in byte form.
@@ -175,7 +832,7 @@ class Client:
         text (str): Text to be written on the image.
         '''
 
-        return await self._get("/generators/achievement" if self.dev else "/achievement", "?avatar={}&text={}".format(avatar, text))
+        return await self.request("achievement", avatar, text)
 
     async def thesearch(self, avatar, text):
         '''Returns a thesearch image in byte form.
@@ -189,7 +846,7 @@ class Client:
         text (str): Text to be written on the image.
         '''
 
-        return await self._get("/generators/thesearch" if self.dev else "/thesearch", "?avatar={}&text={}".format(avatar, text))
+        return await self.request("thesearch", avatar, text)
 
     async def beautiful(self, avatar):
         '''Returns a beautiful image in byte form.
@@ -202,7 +859,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/beautiful" if self.dev else "/beautiful", "?avatar={}".format(avatar))
+        return await self.request("beautiful", avatar)
 
     async def facepalm(self, avatar):
         '''Returns a facepalm image in byte form.
@@ -215,7 +872,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/facepalm" if self.dev else "/facepalm", "?avatar={}".format(avatar))
+        return await self.request("facepalm", avatar)
 
     async def respect(self, avatar):
         '''Returns a respect image in byte form.
@@ -228,7 +885,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/respect" if self.dev else "/respect", "?avatar={}".format(avatar))
+        return await self.request("respect", avatar)
 
     async def stepped(self, avatar):
         '''Returns a stepped image in byte form.
@@ -241,7 +898,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/stepped" if self.dev else "/stepped", "?avatar={}".format(avatar))
+        return await self.request("stepped", avatar)
 
     async def tattoo(self, avatar):
         '''Returns a tattoo image in byte form.
@@ -254,7 +911,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/tattoo" if self.dev else "/tattoo", "?avatar={}".format(avatar))
+        return await self.request("tattoo", avatar)
 
     async def vault(self, avatar):
         '''Returns a vault image in byte form.
@@ -267,8 +924,8 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        return await self._get("/generators/vault" if self.dev else "/vault", "?avatar={}".format(avatar))
-       
+        return await self.request("vault", avatar)
+
     async def challenger(self, avatar):
         '''Returns a challenger image in byte form.
 
@@ -280,10 +937,8 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Challenger endpoint is disabled while in production")
-        return await self._get("/generators/challenger", "?avatar={}".format(avatar))
-       
+        return await self.request("challenger", avatar)
+
     async def batslap(self, slapper, slapped):
         '''Returns a batslap image in byte form.
 
@@ -296,8 +951,8 @@ class Client:
         slapped (str): Link to the image of the slapped to be filtered.
         '''
 
-        return await self._get("/generators/batslap" if self.dev else "/batslap", "?slapper={}&slapped={}".format(slapper, slapped))
-       
+        return await self.request("batslap", slapper, slapped)
+
     async def superpunch(self, puncher, punched):
         '''Returns a superpunch image in byte form.
 
@@ -310,8 +965,8 @@ class Client:
         punched (str): Link to the image of the punched to be filtered.
         '''
 
-        return await self._get("/generators/superpunch" if self.dev else "/superpunch", "?puncher={}&punched={}".format(puncher, punched))
-       
+        return await self.request("superpunch", puncher, punched)
+
     async def slap(self, slapper, slapped):
         '''Returns a slap image in byte form.
 
@@ -324,8 +979,8 @@ class Client:
         slapped (str): Link to the image of the slapped to be filtered.
         '''
 
-        return await self._get("/generators/slap" if self.dev else "/slap", "?slapper={}&slapped={}".format(slapper, slapped))
-   
+        return await self.request("slap", slapper, slapped)
+
     async def karen(self, avatar):
         '''Returns a karen image in byte form.
 
@@ -337,10 +992,8 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Karen endpoint is disabled while in production")
-        return await self._get("/generators/karen", "?avatar={}".format(avatar))
-       
+        return await self.request("karen", avatar)
+
     async def steam(self, avatar, text):
         '''Returns a steam image in byte form.
 
@@ -353,9 +1006,7 @@ class Client:
         text (str): The text to be written on the image.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Steam endpoint is disabled while in production")
-        return await self._get("/generators/steam", "?avatar={}&text={}".format(avatar, text))
+        return await self.request("steam", avatar, text)
 
     async def bobross(self, avatar):
         '''Returns a bobross image in byte form.
@@ -368,9 +1019,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Bobross endpoint is disabled while in production")
-        return await self._get("/generators/bobross", "?avatar={}".format(avatar))
+        return await self.request("bobross", avatar)
 
     async def heavyfear(self, avatar):
         '''Returns a heavyfear image in byte form.
@@ -383,9 +1032,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Heavyfear endpoint is disabled while in production")
-        return await self._get("/generators/heavyfear", "?avatar={}".format(avatar))
+        return await self.request("heavyfear", avatar)
 
     async def painting(self, avatar):
         '''Returns a painting image in byte form.
@@ -398,9 +1045,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Painting endpoint is disabled while in production")
-        return await self._get("/generators/painting", "?avatar={}".format(avatar))
+        return await self.request("painting", avatar)
 
     async def waifu_insult(self, avatar):
         '''Returns a waifu insult image in byte form.
@@ -413,9 +1058,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Waifuinsult endpoint is disabled while in production")
-        return await self._get("/generators/waifuinsult", "?avatar={}".format(avatar))
+        return await self.request("waifu_insult", avatar)
 
     async def wreckit(self, avatar):
         '''Returns a wreckit image in byte form.
@@ -428,9 +1071,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Wreckit endpoint is disabled while in production")
-        return await self._get("/generators/wreckit", "?avatar={}".format(avatar))
+        return await self.request("wreckit", avatar)
 
     async def approved(self, avatar):
         '''Returns a approved image in byte form.
@@ -443,9 +1084,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Approved endpoint is disabled while in production")
-        return await self._get("/overlays/approved", "?avatar={}".format(avatar))
+        return await self.request("approved", avatar)
 
     async def rainbow(self, avatar):
         '''Returns a rainbow image in byte form.
@@ -458,9 +1097,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Rainbow endpoint is disabled while in production")
-        return await self._get("/overlays/rainbow", "?avatar={}".format(avatar))
+        return await self.request("rainbow", avatar)
 
     async def rejected(self, avatar):
         '''Returns a rejected image in byte form.
@@ -473,9 +1110,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Rejected endpoint is disabled while in production")
-        return await self._get("/overlays/rejected", "?avatar={}".format(avatar))
+        return await self.request("rejected", avatar)
 
     async def brightness(self, avatar, brightness):
         '''Returns a image with brightness in byte form.
@@ -489,11 +1124,7 @@ class Client:
         brightness (int): How much brightness to put on the image.
         '''
 
-        if br_invalid(brightness):
-            raise InvalidParam('Invalid brightness')
-        if not self.dev:
-            raise NotAvailable("Brightness endpoint is disabled while in production")
-        return await self._get("/effects/brightness", "?avatar={}&brightness={}".format(avatar, brightness))
+        return await self.request("brightness", avatar, brightness)
 
     async def darkness(self, avatar, darkness):
         '''Returns a image with darkness in byte form.
@@ -507,11 +1138,7 @@ class Client:
         darkness (int): How much darkness to put on the image.
         '''
 
-        if br_invalid(darkness):
-            raise InvalidParam('Invalid darkness')
-        if not self.dev:
-            raise NotAvailable("Darkness endpoint is disabled while in production")
-        return await self._get("/effects/darkness", "?avatar={}&darkness={}".format(avatar, darkness))
+        return await self.request("darkness", avatar, darkness)
 
     async def greyscale(self, avatar):
         '''Returns a image with greyscale in byte form.
@@ -524,9 +1151,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Greyscale endpoint is disabled while in production")
-        return await self._get("/effects/greyscale", "?avatar={}".format(avatar))
+        return await self.request("greyscale", avatar)
 
     async def invert(self, avatar):
         '''Returns a image with invert in byte form.
@@ -539,9 +1164,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Invert endpoint is disabled while in production")
-        return await self._get("/effects/invert", "?avatar={}".format(avatar))
+        return await self.request("invert", avatar)
 
     async def invert_greyscale(self, avatar):
         '''Returns a image with invertGreyscale in byte form.
@@ -554,9 +1177,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("InvertGreyscale endpoint is disabled while in production")
-        return await self._get("/effects/invertGreyscale", "?avatar={}".format(avatar))
+        return await self.request("invert_greyscale", avatar)
 
     async def sepia(self, avatar):
         '''Returns a image with sepia in byte form.
@@ -569,9 +1190,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Sepia endpoint is disabled while in production")
-        return await self._get("/effects/sepia", "?avatar={}".format(avatar))
+        return await self.request("sepia", avatar)
 
     async def silhouette(self, avatar):
         '''Returns a image with silhouette in byte form.
@@ -584,9 +1203,7 @@ class Client:
         avatar (str): Link to the image to be filtered.
         '''
 
-        if not self.dev:
-            raise NotAvailable("Silhouette endpoint is disabled while in production")
-        return await self._get("/effects/silhouette", "?avatar={}".format(avatar))
+        return await self.request("silhouette", avatar)
 
     async def invert_threshold(self, avatar, threshold):
         '''Returns a image with inverted threshold in byte form.
@@ -600,11 +1217,7 @@ class Client:
         threshold (int): How much threshold to put on the image.
         '''
 
-        if br_invalid(threshold):
-            raise InvalidParam('Invalid threshold')
-        if not self.dev:
-            raise NotAvailable("Threshold endpoint is disabled while in production")
-        return await self._get("/effects/invertThreshold", "?avatar={}&threshold={}".format(avatar, threshold))
+        return await self.request("invert_threshold", avatar, threshold)
 
     async def threshold(self, avatar, threshold):
         '''Returns a image with threshold in byte form.
@@ -618,11 +1231,7 @@ class Client:
         threshold (int): How much threshold to put on the image.
         '''
 
-        if br_invalid(threshold):
-            raise InvalidParam('Invalid threshold')
-        if not self.dev:
-            raise NotAvailable("Threshold endpoint is disabled while in production")
-        return await self._get("/effects/threshold", "?avatar={}&threshold={}".format(avatar, threshold))
+        return await self.request("threshold", avatar, threshold)
 
     async def crush(self, crusher, crush):
         '''Returns a crush image in byte form.
@@ -636,7 +1245,7 @@ class Client:
         crush (str): Link to the image of the crush to be filtered.
         '''
 
-        return await self._get("/generators/crush" if self.dev else "/crush", "?crusher={}&crush={}".format(crusher, crush))
+        return await self.request("crush", crusher, crush)
 
     async def welcome(self, avatar, is_bot, usertag, guild, version="gearz"):
         '''Returns a welcome image in byte form.
@@ -652,14 +1261,8 @@ class Client:
         guild (str): The guild's name.
         version (str): Which Welcome picture to use.
         '''
-        usertag_fixed = urllib.parse.quote(usertag)
-        guild_fixed = urllib.parse.quote(guild)
-        if not version == "gearz":
-            if not self.dev:
-                raise NotAvailable("Anime endpoint is disabled while in production")
-            else:
-                return await self._get("/greetings/{}_welcome".format(version), "?bot={}&usertag={}&avatar={}".format(is_bot, usertag, avatar))
-        return await self._get("/greetings/{}_welcome".format(version) if self.dev else "/{}_welcome".format(version), "?guild={}&bot={}&usertag={}&avatar={}".format(guild_fixed, is_bot, usertag_fixed, avatar))
+
+        return await self.request("welcome", avatar, is_bot, usertag, guild, version)
 
     async def goodbye(self, avatar, is_bot, usertag, version="gearz"):
         '''Returns a goodbye image in byte form.
@@ -674,11 +1277,8 @@ class Client:
         usertag (str): The user's tag.
         version (str): Which Goodbye picture to use.
         '''
-        usertag_fixed = urllib.parse.quote(usertag)
-        if not self.dev:
-            if not version == "gearz":
-                raise NotAvailable("Anime endpoint is disabled while in production")
-        return await self._get("/greetings/{}_goodbye".format(version) if self.dev else "/{}_goodbye".format(version), "?bot={}&usertag={}&avatar={}".format(is_bot, usertag_fixed, avatar))
+
+        return await self.request("goodbye", avatar, is_bot, usertag, version)
 
     async def confused(self, avatar, photo):
         '''Returns a confused image in bytes.
@@ -687,8 +1287,8 @@ class Client:
         avatar (str): Avatar url.
         photo (str): a url for second picture.
         '''
-        if not self.dev: raise NotAvailable("Confused endpoint is disabled while in production")
-        return await self._get("/generators/confused", "?avatar={}&photo={}".format(avatar, photo))
+
+        return await self.request("confused", avatar, photo)
 
     async def garbage(self, avatar):
         '''Returns a garbage image in bytes.
@@ -697,8 +1297,8 @@ class Client:
 
         avatar (str): Image url to use.
         '''
-        if not self.dev: raise NotAvailable("Garbage endpoint is disabled while in production")
-        return await self._get("/generators/garbage", "?avatar={}".format(avatar))
+
+        return await self.request("garbage", avatar)
 
     async def super_spank(self, spanker, spanked):
         """Returns spanked image in bytes.
@@ -707,150 +1307,146 @@ class Client:
         spanker (str): image url to use for spanker
         spanked (str): image url for spanked
         """
-        if not self.dev: raise NotAvailable("Spanked endpoint is disabled while in production")
-        return await self._get("/generators/superspank", "?spanker={}&spanked={}".format(spanker, spanked))
+
+        return await self.request("super_spank", spanker, spanked)
+
     async def tinder_match(self, avatar, match):
         """Returns a tinder match image in bytes
         Params:
         avatar (str): avatar image url
         match (str): image url for match image.
         """
-        if not self.dev: raise NotAvailable("Tinder Match endpoint is disabled while in production")
-        return await self._get("/generators/tinder", "?avatar={}&match={}".format(avatar, match))
+
+        return await self.request("tinder_match", avatar, match)
 
     async def colour(self, colour):
         """Colour endpoint
         Params:
         colour (str): Supply a colour code in any of these supported formats `hex`, `rgb`, `rgba`
         """
-        if not self.dev: raise NotAvailable("Colour endpoint is disabled while in production")
-        return await self._get("/generators/colour", "?colour={}".format(colour))
-    
+
+        return await self.request("colour", colour)
+
     async def color(self, color):
         """Aliase for colour"""
-        return await self.colour(color)
-    
+
+        return await self.request("colour", color)
+
     async def owoify(self, text):
         """owoify a text.
         Params:
         text (str): The text you would like to use.
         """
-        if not self.dev: raise NotAvailable("owoify endpoint is disabled while in production")
-        if type(text) != str: raise TypeError("Text must be string")
-        return await self._text("owoify", text)
-    
+
+        return await self.request("owoify", text)
+
     async def mock(self, text):
         """Mock a text
         Params:
         text (str): Text you would like to use
         """
-        if not self.dev: raise NotAvailable("Mock endpoint is disabled while in production")
-        if type(text) != str: raise TypeError("Text must be a string")
-        return await self._text("mock", text)
+
+        return await self.request("mock", text)
+
     async def tiny(self, text, style):
         """Make a text tiny with a style.
         Params:
         text (str): Text to use.
         style (str): One of tiny, superscript, subscript
         """
-        if not self.dev: raise NotAvailable("Tiny text endpoint is disabled while in production")
-        if type(text) != str: raise TypeError("Text must be a string")
-        if style.lower() not in ["tiny", "superscript", "subscript"]: raise TypeError("Style must be one of tiny, superscript, subscript")
-        return await self._text("tinytext", text, style.lower())
- 
+
+        return await self.request("tiny", text, style)
+
     async def cursive(self, text, style):
         """Make a cursive text with specified style
         Params:
         text (str): Text you want to use.
         style (str): One of normal or bold
         """
-        if not self.dev: raise NotAvailable("Cursive endpoint is disabled while in production")
-        if type(text) != str: raise TypeError("Text must be a string")
-        if style.lower() not in ["bold", "normal"]: raise TypeError("Style must be one of bold or normal")
-        return await self._text("cursive", text, style.lower())
+
+        return await self.request("cursive", text, style)
 
     async def vapor(self, text):
         """Returns a vaporwave text
         Params:
         text (str): Text you want to use.
         """
-        if not self.dev: raise NotAvailable("Vapor endpoint is disabled while in production")
-        if type(text) != str: raise TypeError("Text must be a string")
-        return await self._text("vaporwave", text)
-    
+
+        return await self.request("vapor", text)
+
     async def time(self, avatar):
         """Returns a time image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Time endpoint is disabled while in production")
-        return await self._get("/generators/time", "?avatar={}".format(avatar))
-    
+
+        return await self.request("time", avatar)
+
     async def ignore(self, avatar):
         """Returns an ignore image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Ignore endpoint is disabled while in production")
-        return await self._get("/generators/ignore", "?avatar={}".format(avatar))
-     
+
+        return await self.request("ignore", avatar)
+
     async def hide(self, avatar):
         """Returns a hide image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Hide endpoint is disabled while in production")
-        return await self._get("/generators/hide", "?avatar={}".format(avatar))
-        
+
+        return await self.request("hide", avatar)
+
     async def hates(self, avatar):
         """Returns a time image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Hates endpoint is disabled while in production")
-        return await self._get("/generators/hates", "?avatar={}".format(avatar))
-        
+
+        return await self.request("hates", avatar)
+
     async def girls(self, avatar):
         """Returns girls image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Girls endpoint is disabled while in production")
-        return await self._get("/generators/girls", "?avatar={}".format(avatar))
-    
+
+        return await self.request("girls", avatar)
+
     async def zerotwo(self, avatar):
         """Returns a Zero Two image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Zero Two endpoint is disabled while in production")
-        return await self._get("/generators/02picture", "?avatar={}".format(avatar))
-    
+
+        return await self.request("zerotwo", avatar)
+
     async def coffee(self, text1, text2):
         """Returns a coffee image in bytes.
         Params:
         text1 (str): Text 1 to use
         text2 (str): Text 2 to use
         """
-        if not self.dev: raise NotAvailable("Coffee endpoint is disabled while in production")
-        return await self._get("/generators/coffee", "?text1={}&text2={}".format(text1, text2))
-    
+
+        return await self.request("coffee", text1, text2)
+
     async def religion(self, avatar):
         """Returns a religion image in bytes.
         Params:
         avatar (str): Avatar url to use.
         """
-        if not self.dev: raise NotAvailable("Religion endpoint is disabled while in production")
-        return await self._get("/generators/religion", "?avatar={}".format(avatar))
-        
+
+        return await self.request("religion", avatar)
+
     async def suggestion(self, avatar, text):
         """Returns a suggestion image in bytes.
         Params:
         avatar (str): Avatar url to use.
         text (str): Text to use.
         """
-        if not self.dev: raise NotAvailable("Suggestion endpoint is disabled while in production")
-        return await self._get("/generators/suggestion", "?avatar={}&suggestion={}".format(avatar, text))
+
+        return await self.request("suggestion", avatar, text)
 
     async def kirby(self, avatar, text):
         """Kirby School endpoint
@@ -859,9 +1455,8 @@ class Client:
         text (str): Supply the build up text
         returns (bytes) 
         """
-        if not self.dev:
-            raise NotAvailable("Kirby School endpoint is disabled while in production")
-        return await self._get("/generators/kirby", "?avatar={}&text={}".format(avatar, text))
+
+        return await self.request("kirby", avatar, text)
 
     async def virtual(self, avatar, text):
         """Virtual endpoint
@@ -869,9 +1464,8 @@ class Client:
         avatar (str): Image you expect to be used
         returns (bytes) 
         """
-        if not self.dev:
-            raise NotAvailable("Virtual endpoint is disabled while in production")
-        return await self._get("/generators/vr", "?avatar={}".format(avatar))
+
+        return await self.request("virtual", avatar)
 
     async def changemymind(self, avatar, text):
         """Change my mind endpoint
@@ -880,19 +1474,17 @@ class Client:
         text (str): Supply the build up text
         returns (bytes) 
         """
-        if not self.dev:
-            raise NotAvailable("Change my mind endpoint is disabled while in production")
-        return await self._get("/generators/changemymind", "?avatar={}&text={}".format(avatar, text))
-        
+
+        return await self.request("changemymind", avatar, text)
+
     async def sniper(self, avatar):
         """Sniper endpoint
         params:
         avatar (str): Image you expect to be used
         returns (bytes) 
         """
-        if not self.dev:
-            raise NotAvailable("Sniper endpoint is disabled while in production")
-        return await self._get("/generators/sniper", "?avatar={}".format(avatar))
+
+        return await self.request("sniper", avatar)
 
     async def osu(self, user, theme = "dark"):
         """osu! endpoint
@@ -901,11 +1493,8 @@ class Client:
         theme (str): Select between 3 valid themes, light, dark and darker
         returns (bytes) 
         """
-        if not self.dev:
-            raise NotAvailable("osu endpoint is disabled while in production")
-        if theme not in ("dark", "light", "darker"):
-            raise TypeError("Invalid theme, theme can only be one of dark, light, darker")
-        return await self._get("/generators/osu", "?user={}&theme={}".format(user, theme))
+
+        return await self.request("osu", user, theme)
 
     async def greeting(self, Type, version, bot, avatar, username, discriminator, guildName, memberCount, message = ""):
         """
@@ -922,21 +1511,7 @@ class Client:
         message: (str) = '' An optional message for the greeting
         returns: (bytes)
         """
-        return await self._get("/greetings/unified", "?version={}&type={}&bot={}&avatar={}&username={}&discriminator={}&guildName={}&memberCount={}&message={}".format(version, Type, str(bot).lower(), avatar, username, discriminator, guildName, memberCount, message))
-
 
+        return await self.request("greeting", Type, version, bot, avatar, username, discriminator, guildName, memberCount, message)
 
-
- 
-
-
-# --------------------
-# |     Errors       |
-# --------------------
-class IdioticError(Exception):
-    pass
-class NotAvailable(IdioticError):
-    pass
-class InvalidParam(IdioticError):
-    pass
 # This file went longer than i expected :p
@@ -1,4 +1,17 @@
 from .Client import Client
+from .backends import Backend
+from .batch import BatchResult
+from .breaker import CircuitBreaker
+from .cache import DiskCache, MemoryCache
+from .endpoints import ENDPOINTS, Endpoint
+from .errors import CircuitOpen, HTTPException, IdioticError, InvalidParam, NotAvailable, RateLimited
+from .greetings import GreetingTemplate, Member
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .scheduler import Scheduler
+from .sync import SyncClient
+from .transcode import Transcoder
 
 __version__ = "1.2.0"
 __github__ = "https://github.com/freetnt5852/idioticapi"
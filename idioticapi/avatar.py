@@ -0,0 +1,58 @@
+import re
+import urllib.parse
+
+# Hosts serving Discord avatars, they all take the same size param.
+DISCORD_HOSTS = frozenset(("cdn.discordapp.com", "media.discordapp.net", "images.discordapp.net"))
+
+# Paths of avatars on those hosts: user avatars, default avatars and
+# guild member avatars. Attachments and the like are left alone, their
+# query carries a signature and their format is the file's own.
+AVATAR_PATH = re.compile(r"/(avatars/\d+|embed/avatars|guilds/\d+/users/\d+/avatars)/[^/]+$")
+
+# Sizes the Discord CDN can serve.
+SIZES = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+DEFAULT_SIZE = 256
+
+# How big a source image each endpoint needs, by endpoint name. Effects and
+# overlays return an image the size of their input, so they get a larger one.
+ENDPOINT_SIZES = {
+    "batslap": 128, "slap": 128, "superpunch": 128, "crush": 128, "superspank": 128,
+    "achievement": 64, "steam": 128, "tinder": 128, "unified": 256,
+    "wanted": 512, "painting": 512, "bobross": 512, "beautiful": 512, "vault": 512,
+    "brightness": 512, "darkness": 512, "greyscale": 512, "invert": 512,
+    "invertGreyscale": 512, "sepia": 512, "silhouette": 512, "threshold": 512,
+    "invertThreshold": 512, "approved": 512, "rejected": 512, "rainbow": 512
+}
+
+def size_for(endpoint):
+    '''Return the avatar size an endpoint needs.'''
+
+    return ENDPOINT_SIZES.get(endpoint.rsplit("/", 1)[-1], DEFAULT_SIZE)
+
+def normalize_avatar(url, size=DEFAULT_SIZE):
+    '''Return the canonical form of an avatar url.
+
+    Discord CDN urls for the same avatar only differ in format and
+    size params, this rewrites webp avatars to png, drops every
+    query param and asks for the smallest CDN size of at least
+    `size`. Other urls, attachments on the CDN too, are returned
+    unchanged.
+
+    Params:
+
+    url (str): The avatar url.
+    size (int): The smallest width in pixels needed.
+    '''
+
+    try:
+        parts = urllib.parse.urlsplit(url)
+    except ValueError:
+        return url
+    if parts.hostname not in DISCORD_HOSTS or not AVATAR_PATH.match(parts.path):
+        return url
+    path = parts.path
+    if path.endswith(".webp"):
+        path = path[:-5] + ".png"
+    size = next((option for option in SIZES if option >= size), SIZES[-1])
+    return urllib.parse.urlunsplit(("https", parts.netloc, path, "size={}".format(size), ""))
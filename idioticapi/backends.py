@@ -0,0 +1,123 @@
+import time
+
+from .decoder import ACCEPT, ACCEPT_ENCODING
+
+DEV_URL = "https://dev.anidiots.guide"
+PROD_URL = "https://api.anidiots.guide"
+
+class Backend:
+    '''A server the API can be requested from.
+
+    url (str): Its base url, e.g. https://api.anidiots.guide.
+    dev (bool): Whether it serves the development paths, e.g.
+    /generators/blame, or the production ones, e.g. /blame.
+    token (str): The token it takes. Defaults to the Client's.
+
+    latency (float): Moving average of the seconds its responses took
+    to arrive, None until it answered once.
+    failures (int): Failures in a row, connection errors and 5xx.
+    inflight (int): Requests sent to it that haven't finished.
+    '''
+
+    __slots__ = ("url", "dev", "token", "headers", "latency", "failures", "down_until", "requests", "inflight")
+
+    def __init__(self, url, dev=False, token=None):
+        self.url = url.rstrip("/")
+        self.dev = dev
+        self.token = token
+        self.headers = None
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.inflight = 0
+
+    def __repr__(self):
+        return "<Backend url={} dev={} latency={}>".format(self.url, self.dev, self.latency)
+
+class Backends:
+    '''Picks the backend each request goes to.
+
+    Requests go to the backend with the lowest latency, averaged as
+    an EWMA with weight `alpha`, times the requests it already has
+    in flight. Backends that never answered are tried first, so
+    every one gets measured. A backend that fails is left out for
+    `cooldown` seconds, doubled for each further failure in a row
+    up to 8 times as long, unless no other one can serve.
+
+    backends (list): Backend objects, urls, or (url, dev) tuples.
+    dev (bool): Paths served by backends given as plain urls.
+    token (str): Token of the backends that don't set one.
+    '''
+
+    def __init__(self, backends, dev=False, token=None, alpha=0.3, cooldown=5.0):
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.backends = []
+        for backend in backends:
+            if isinstance(backend, str):
+                backend = Backend(backend, dev)
+            elif isinstance(backend, tuple):
+                backend = Backend(*backend)
+            if backend.token is None:
+                backend.token = token
+            backend.headers = {
+                "Authorization" if backend.dev else "token": backend.token,
+                "Accept": ACCEPT,
+                "Accept-Encoding": ACCEPT_ENCODING
+            }
+            self.backends.append(backend)
+        if not self.backends:
+            raise ValueError("At least one backend is needed")
+
+    def __repr__(self):
+        return "<Backends {}>".format(self.backends)
+
+    def __iter__(self):
+        return iter(self.backends)
+
+    def __len__(self):
+        return len(self.backends)
+
+    @property
+    def primary(self):
+        '''The first backend, which names requests in caches and metrics.'''
+
+        return self.backends[0]
+
+    def choose(self, usable=None, exclude=()):
+        '''Return the backend the next request should go to.
+
+        usable (callable): Called with a Backend, False when it can't
+        serve the request.
+        exclude (tuple): Backends already tried for this request, only
+        picked when nothing else is left.
+        '''
+
+        now = time.monotonic()
+        candidates = [backend for backend in self.backends if usable is None or usable(backend)]
+        if not candidates:
+            raise ValueError("No backend can serve this request")
+        fresh = [backend for backend in candidates if backend not in exclude] or candidates
+        healthy = [backend for backend in fresh if backend.down_until <= now]
+        if not healthy:
+            return min(fresh, key=lambda backend: backend.down_until)
+        return min(healthy, key=lambda backend: ((backend.latency or 0.0) * (backend.inflight + 1), backend.inflight))
+
+    def succeeded(self, backend, elapsed):
+        '''Record a backend answering in `elapsed` seconds.'''
+
+        backend.requests += 1
+        backend.failures = 0
+        backend.down_until = 0.0
+        if backend.latency is None:
+            backend.latency = elapsed
+        else:
+            backend.latency += self.alpha * (elapsed - backend.latency)
+
+    def failed(self, backend):
+        '''Record a backend failing, it is left out for a while.'''
+
+        backend.requests += 1
+        backend.failures += 1
+        backend.down_until = time.monotonic() + self.cooldown * min(8, 2 ** (backend.failures - 1))
@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque, namedtuple
+
+class BatchResult(namedtuple("BatchResult", "index args result error")):
+    '''The outcome of one call in a batch.
+
+    index (int): Position of the call in the input.
+    args: The arguments the call was made with.
+    result: What the call returned, None if it failed.
+    error (Exception): What the call raised, None if it succeeded.
+    '''
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+def split_args(args):
+    '''Turn one input item into (args, kwargs).
+
+    Tuples are passed as positional arguments, dicts as keyword
+    arguments and anything else as the only argument.
+    '''
+
+    if isinstance(args, tuple):
+        return args, {}
+    if isinstance(args, dict):
+        return (), args
+    return (args,), {}
+
+class BatchIterator:
+    '''Runs calls with bounded concurrency and yields their results.
+
+    Calls are taken from `calls`, an iterable or async iterable of
+    (func, args) pairs, or of just args when `func` is given. They
+    are only taken when fewer than `concurrency` results are
+    pending, so a long or endless input is read as results are
+    consumed. Results are BatchResult objects yielded as the calls
+    finish, or in input order when `ordered` is True. A failed call
+    is yielded with its error and does not stop the others.
+
+    Use with `async for`. Leaving an `async with` block around it,
+    or calling aclose(), cancels the calls still running.
+    '''
+
+    def __init__(self, calls, concurrency=8, ordered=False, func=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.func = func
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self._calls = calls
+        self._iterator = None
+        self._exhausted = False
+        self._index = 0
+        self._next = 0
+        self._running = {}
+        self._finished = {} if ordered else deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def __anext__(self):
+        while True:
+            await self._fill()
+            if self.ordered:
+                if self._next in self._finished:
+                    self._next += 1
+                    return self._finished.pop(self._next - 1)
+            elif self._finished:
+                return self._finished.popleft()
+            if not self._running:
+                raise StopAsyncIteration
+            done, _ = await asyncio.wait(list(self._running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, args = self._running.pop(task)
+                if task.cancelled():
+                    result = BatchResult(index, args, None, asyncio.CancelledError())
+                elif task.exception() is not None:
+                    result = BatchResult(index, args, None, task.exception())
+                else:
+                    result = BatchResult(index, args, task.result(), None)
+                if self.ordered:
+                    self._finished[index] = result
+                else:
+                    self._finished.append(result)
+
+    async def aclose(self):
+        '''Cancel the calls still running.'''
+
+        self._exhausted = True
+        for task in self._running:
+            task.cancel()
+        if self._running:
+            await asyncio.wait(list(self._running))
+        self._running.clear()
+
+    async def _take(self):
+        if self._iterator is None:
+            if hasattr(self._calls, "__aiter__"):
+                self._iterator = self._calls.__aiter__()
+            else:
+                self._iterator = iter(self._calls)
+        try:
+            if hasattr(self._iterator, "__anext__"):
+                return await self._iterator.__anext__()
+            return next(self._iterator)
+        except (StopIteration, StopAsyncIteration):
+            self._exhausted = True
+            return None
+
+    async def _fill(self):
+        while not self._exhausted and len(self._running) + len(self._finished) < self.concurrency:
+            call = await self._take()
+            if self._exhausted:
+                return
+            if self.func is None:
+                func, args = call
+            else:
+                func, args = self.func, call
+            positional, keywords = split_args(args)
+            task = asyncio.ensure_future(func(*positional, **keywords))
+            self._running[task] = (self._index, args)
+            self._index += 1
+
+async def gather_batch(batch):
+    '''Run a BatchIterator to the end and return its results in input order.'''
+
+    results = []
+    async with batch:
+        async for result in batch:
+            results.append(result)
+    results.sort(key=lambda result: result.index)
+    return results
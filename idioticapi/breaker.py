@@ -0,0 +1,166 @@
+import time
+from collections import deque
+
+from .errors import CircuitOpen
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+GROUPS = ("generators", "effects", "overlays", "greetings", "text")
+
+def group_for(endpoint):
+    '''Return the group of an endpoint path, e.g. effects for /effects/sepia.
+
+    Production paths have no group segment, they are all generators
+    except the greetings.
+    '''
+
+    parts = endpoint.strip("/").split("/")
+    if len(parts) > 1:
+        return parts[0]
+    if endpoint.endswith(("_welcome", "_goodbye")):
+        return "greetings"
+    return "generators"
+
+class Circuit:
+    '''The state of one group's circuit.'''
+
+    __slots__ = ("state", "outcomes", "opened_at", "probes", "opened")
+
+    def __init__(self, window):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.opened = 0
+
+class CircuitBreaker:
+    '''Fails requests at once while a group of endpoints is failing.
+
+    Every endpoint group (generators, effects, overlays, greetings,
+    text) has its own circuit. It opens when at least `error_rate`
+    of the last `window` requests failed, once `min_calls` were seen.
+    Server errors, connection errors, timeouts and responses slower
+    than `latency` count as failures, other statuses don't. While
+    open, requests to the group raise CircuitOpen without touching
+    the network. After `cooldown` seconds the circuit is half-open
+    and lets `probes` requests through, it closes when they succeed
+    and opens again when one fails. Pass it to the Client as `breaker`.
+    '''
+
+    def __init__(self, error_rate=0.5, latency=None, window=20, min_calls=5, cooldown=30.0, probes=1):
+        '''Constructs the breaker.
+
+        error_rate (float): Share of failed requests that opens the
+        circuit. Defaults to 0.5.
+
+        latency (float): Seconds after which a request counts as failed
+        even if it succeeded. Defaults to None, no limit.
+
+        window (int): How many of the latest requests are looked at.
+        Defaults to 20.
+
+        min_calls (int): Requests needed in the window before it can
+        open. Defaults to 5.
+
+        cooldown (float): Seconds a circuit stays open. Defaults to 30.
+
+        probes (int): Requests let through at once while half-open.
+        Defaults to 1.
+        '''
+
+        self.error_rate = error_rate
+        self.latency = latency
+        self.window = window
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.probes = probes
+        self.rejected = 0
+        self._circuits = {}
+
+    def __repr__(self):
+        return "<CircuitBreaker degraded={}>".format(sorted(self.degraded))
+
+    def circuit(self, group):
+        circuit = self._circuits.get(group)
+        if circuit is None:
+            circuit = self._circuits[group] = Circuit(self.window)
+        return circuit
+
+    def state(self, group):
+        '''Return the state of a group, one of closed, open and half-open.'''
+
+        circuit = self.circuit(group)
+        if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.cooldown:
+            return HALF_OPEN
+        return circuit.state
+
+    def states(self):
+        '''Return the state of every group.'''
+
+        return {group: self.state(group) for group in GROUPS}
+
+    @property
+    def degraded(self):
+        '''The groups whose circuit isn't closed.'''
+
+        return {group for group in self._circuits if self.state(group) != CLOSED}
+
+    def before(self, endpoint):
+        '''Let a request to an endpoint through, or raise CircuitOpen.'''
+
+        group = group_for(endpoint)
+        circuit = self.circuit(group)
+        if circuit.state == CLOSED:
+            return
+        if circuit.state == OPEN:
+            wait = circuit.opened_at + self.cooldown - time.monotonic()
+            if wait > 0:
+                self.rejected += 1
+                raise CircuitOpen(group, wait)
+            circuit.state = HALF_OPEN
+            circuit.probes = 0
+        if circuit.probes >= self.probes:
+            self.rejected += 1
+            raise CircuitOpen(group, None)
+        circuit.probes += 1
+
+    def release(self, endpoint):
+        '''Give back the probe of a request let through by before() that was never sent.'''
+
+        circuit = self.circuit(group_for(endpoint))
+        if circuit.state == HALF_OPEN:
+            circuit.probes = max(0, circuit.probes - 1)
+
+    def record(self, endpoint, status, error, elapsed):
+        '''Record how a request let through by before() ended.
+
+        Requests that got no response or a 5xx failed. A request that
+        ended with neither a status nor an error, e.g. because it was
+        cancelled, only gives back its probe.
+        '''
+
+        self.release(endpoint)
+        if status is None and error is None:
+            return
+        circuit = self.circuit(group_for(endpoint))
+        failed = status is None or status >= 500 or (self.latency is not None and elapsed > self.latency)
+        if circuit.state == HALF_OPEN:
+            if failed:
+                self._open(circuit)
+            else:
+                circuit.state = CLOSED
+                circuit.outcomes.clear()
+            return
+        if circuit.state == OPEN:
+            return
+        circuit.outcomes.append(failed)
+        if len(circuit.outcomes) >= self.min_calls and sum(circuit.outcomes) >= self.error_rate * len(circuit.outcomes):
+            self._open(circuit)
+
+    def _open(self, circuit):
+        circuit.state = OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.opened += 1
+        circuit.outcomes.clear()
@@ -0,0 +1,344 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+def make_key(base_url, endpoint, params, name=None):
+    '''Build the cache key for a request.
+
+    Params:
+
+    base_url (str): The API url the request goes to.
+    endpoint (str): The endpoint path.
+    params (str, dict or list): The querystring, a dict of params
+    or a list of (key, value) pairs.
+    name (str): The endpoint's name, e.g. greeting, which TTLs are
+    looked up by. Defaults to the last segment of the path.
+    '''
+
+    if isinstance(params, str):
+        params = urllib.parse.parse_qsl(params.lstrip("?"), keep_blank_values=True)
+    elif isinstance(params, dict):
+        params = params.items()
+    pairs = tuple(sorted((str(k), str(v)) for k, v in params))
+    return (base_url, endpoint, pairs, name or endpoint_name(endpoint))
+
+def endpoint_name(endpoint):
+    '''Return the last segment of an endpoint path, e.g. blame for /generators/blame.'''
+
+    return endpoint.rsplit("/", 1)[-1]
+
+def ttl_for(cache, key):
+    '''Return a cache's TTL in seconds for a key built by make_key, or None.
+
+    Keys without a name are looked up by the last segment of their path.
+    '''
+
+    endpoint = key[1]
+    name = key[3] if len(key) > 3 else endpoint_name(endpoint)
+    if endpoint in cache.ttls:
+        return cache.ttls[endpoint]
+    return cache.ttls.get(name, cache.ttl)
+
+def sizeof(value):
+    '''Return how many bytes a cached value accounts for.'''
+
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(value)
+
+class MemoryCache:
+    '''An in-memory LRU cache for API results.
+
+    Entries are evicted least recently used first once the
+    total size of the cached values goes over `max_bytes`.
+    Pass it to the Client as `cache` to enable it.
+    '''
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None, ttls=None):
+        '''Constructs the cache.
+
+        max_bytes (int): How many bytes of results to keep at most.
+        Defaults to 64 MiB.
+
+        ttl (float): Seconds an entry stays valid. Defaults to None,
+        which keeps entries until they are evicted.
+
+        ttls (dict): Per endpoint TTLs overriding `ttl`, keyed by
+        endpoint name (e.g. "blame", "owoify") or full path.
+        '''
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __repr__(self):
+        return "<MemoryCache entries={} size={}/{}>".format(len(self), self.size, self.max_bytes)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        '''Return the cached value for a key, or None on a miss.'''
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires is None or expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        '''Store a value, evicting old entries to stay within max_bytes.'''
+
+        size = sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        ttl = ttl_for(self, key)
+        self._entries[key] = (value, None if ttl is None else time.monotonic() + ttl)
+        self.size += size
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key):
+        '''Remove a key from the cache if present.'''
+
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        '''Remove every entry. Counters are kept.'''
+
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self):
+        '''Return the cache counters as a dict.'''
+
+        return {
+            "entries": len(self),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self.size -= sizeof(value)
+
+class DiskCache:
+    '''A persistent on-disk LRU cache for API results.
+
+    Every result is stored once in its own file, named after a
+    hash of its key, so several processes can share one directory
+    and results survive restarts. Files are written under a
+    temporary name and renamed into place, so readers never see
+    a partial entry. A file's access time records when it was
+    last used and its modification time when it was written.
+
+    The index of entries is built from a directory scan on first
+    use and kept up to date by this process. Entries written by
+    other processes are picked up when read, or on the rescan that
+    happens once every `rescan_every` evictions. When it goes over
+    `max_bytes` the cache evicts down to `low_watermark` of it, so
+    it doesn't have to evict again on every write. The cache can be
+    used from several threads.
+    '''
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, ttl=None, ttls=None,
+                 low_watermark=0.9, rescan_every=256):
+        '''Constructs the cache.
+
+        directory (str): Where to keep the cache files. Created if
+        it does not exist.
+
+        max_bytes (int): How many bytes of results to keep at most.
+        Defaults to 512 MiB.
+
+        ttl (float): Seconds an entry stays valid. Defaults to None,
+        which keeps entries until they are evicted.
+
+        ttls (dict): Per endpoint TTLs overriding `ttl`, keyed by
+        endpoint name (e.g. "blame", "owoify") or full path.
+
+        low_watermark (float): Share of max_bytes evictions go down to.
+        Defaults to 0.9.
+
+        rescan_every (int): Evictions between rescans of the directory.
+        Defaults to 256.
+        '''
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.low_watermark = low_watermark
+        self.rescan_every = rescan_every
+        self._index = None
+        self._unscanned = 0
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return "<DiskCache directory={!r} size={}/{}>".format(self.directory, self.size, self.max_bytes)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def index(self):
+        '''The entries known to this process, least recently used first.'''
+
+        if self._index is None:
+            self.rescan()
+        return self._index
+
+    def rescan(self):
+        '''Rebuild the index from the files in the cache directory.'''
+
+        entries = []
+        os.makedirs(self.directory, exist_ok=True)
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, entry.path, stat.st_size))
+        entries.sort()
+        with self._lock:
+            self._index = OrderedDict((path, size) for _, path, size in entries)
+            self.size = sum(self._index.values())
+            self._unscanned = 0
+
+    def path_for(self, key, value=None):
+        '''Return the file path used for a key.
+
+        Text results are stored with a .txt suffix and images
+        with .bin, so a key maps to one of two paths.
+        '''
+
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        suffix = ".txt" if isinstance(value, str) else ".bin"
+        return os.path.join(self.directory, digest[:2], digest + suffix)
+
+    def get(self, key):
+        '''Return the cached value for a key, or None on a miss.'''
+
+        index = self.index
+        binary = self.path_for(key)
+        ttl = ttl_for(self, key)
+        for path in (binary, binary[:-4] + ".txt"):
+            try:
+                with open(path, "rb") as f:
+                    stat = os.fstat(f.fileno())
+                    if ttl is not None and stat.st_mtime + ttl <= time.time():
+                        break
+                    data = f.read()
+                os.utime(path, (time.time(), stat.st_mtime))
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.size += stat.st_size - index.pop(path, 0)
+                index[path] = stat.st_size
+                self.hits += 1
+            return data.decode("utf-8") if path.endswith(".txt") else data
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        '''Store a value, evicting old entries to stay within max_bytes.'''
+
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        if len(data) > self.max_bytes:
+            return
+        index = self.index
+        path = self.path_for(key, value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self.size += len(data) - index.pop(path, 0)
+            index[path] = len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        '''Remove a key from the cache if present.'''
+
+        binary = self.path_for(key)
+        for path in (binary, binary[:-4] + ".txt"):
+            self._unlink(path)
+
+    def clear(self):
+        '''Remove every entry. Counters are kept.'''
+
+        for path in list(self.index):
+            self._unlink(path)
+
+    def stats(self):
+        '''Return the cache counters as a dict.'''
+
+        return {
+            "entries": len(self),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _evict(self):
+        '''Evict down to the low watermark, rescanning for other processes' entries now and then.'''
+
+        if self._unscanned >= self.rescan_every:
+            self.rescan()
+        target = self.max_bytes * self.low_watermark
+        while self.size > target and self._index:
+            self._unlink(next(iter(self._index)))
+            self.evictions += 1
+            self._unscanned += 1
+
+    def _unlink(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            size = self.index.pop(path, None)
+            if size is not None:
+                self.size -= size
@@ -0,0 +1,115 @@
+import importlib.util
+import json
+
+try:
+    import orjson
+    loads = orjson.loads
+    BACKEND = "orjson"
+except ImportError:
+    def loads(body):
+        '''Parse a JSON body given as bytes.
+
+        json.loads only takes bytes from Python 3.6, the API sends UTF-8.
+        '''
+
+        return json.loads(body.decode("utf-8"))
+    BACKEND = "json"
+
+BROTLI = any(importlib.util.find_spec(name) is not None for name in ("brotli", "brotlicffi"))
+
+# Sent with every request. Servers and mirrors that can send images as
+# plain bytes are asked to, the JSON shape is still accepted.
+ACCEPT = "image/*, application/octet-stream;q=0.9, application/json;q=0.8"
+# aiohttp decodes these bodies itself, brotli only when it is installed.
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI else "gzip, deflate"
+
+def is_raw(content_type):
+    '''Whether a response of this content type is the image itself.'''
+
+    return content_type.startswith("image/") or content_type == "application/octet-stream"
+
+# Size of the slice of the number array handed to the JSON parser at once.
+# Keeps the temporary list of ints small no matter how big the image is.
+WINDOW = 1 << 18
+
+def decode_image(body, window=WINDOW):
+    '''Decode an image payload into bytes.
+
+    Decodes the `{"type": "Buffer", "data": [...]}` body the API
+    returns for images. The number array is parsed in slices of
+    `window` bytes and written straight into one buffer, so no
+    list with an int per image byte is ever built.
+
+    Params:
+
+    body (bytes): The raw response body.
+    window (int): How many body bytes to parse at once.
+    '''
+
+    try:
+        start = body.index(b"[", body.index(b'"data"'))
+        end = body.index(b"]", start)
+    except ValueError:
+        raise ValueError("Response has no image data") from None
+
+    view = memoryview(body)
+    out = bytearray()
+    pos = start
+    while pos < end:
+        stop = pos + window
+        if stop >= end:
+            stop = end
+        else:
+            # Cut on the last comma inside the window, or the first one after it.
+            cut = body.rfind(b",", pos + 1, stop)
+            if cut == -1:
+                cut = body.find(b",", stop, end)
+            stop = end if cut == -1 else cut
+        out.extend(loads(b"".join((b"[", view[pos + 1:stop], b"]"))))
+        pos = stop
+    return bytes(out)
+
+class StreamDecoder:
+    '''Decode an image payload as it arrives.
+
+    Feed it the response body chunk by chunk, every call returns the
+    image bytes that could be decoded so far. Memory use stays
+    proportional to the chunk size.
+    '''
+
+    def __init__(self):
+        self.done = False
+        self._pending = b""
+        self._started = False
+
+    def feed(self, chunk):
+        '''Decode a chunk of the body and return the image bytes in it.'''
+
+        if self.done:
+            return b""
+        data = self._pending + chunk
+        if not self._started:
+            try:
+                start = data.index(b"[", data.index(b'"data"'))
+            except ValueError:
+                self._pending = data
+                return b""
+            self._started = True
+            data = data[start + 1:]
+        end = data.find(b"]")
+        if end != -1:
+            self.done = True
+            self._pending = b""
+            return bytes(loads(b"".join((b"[", data[:end], b"]"))))
+        cut = data.rfind(b",")
+        if cut == -1:
+            self._pending = data
+            return b""
+        self._pending = data[cut + 1:]
+        return bytes(loads(b"".join((b"[", data[:cut], b"]"))))
+
+    def close(self):
+        '''Check the whole image was decoded.'''
+
+        if not self.done:
+            raise ValueError("Response ended before the image data did")
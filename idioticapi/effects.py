@@ -0,0 +1,110 @@
+import importlib.util
+
+from . import render
+
+AVAILABLE = render.AVAILABLE and importlib.util.find_spec("numpy") is not None
+
+# NumPy is only imported when an effect is applied, see load().
+numpy = None
+
+def load():
+    '''Import NumPy and Pillow.'''
+
+    global numpy
+    if numpy is None:
+        import numpy
+    render.load()
+
+# Local versions of the /effects/ endpoints. Every effect is a kernel
+# taking an (height, width, 4) RGBA array and returning the new one,
+# alpha is kept as it is.
+
+# --------------------
+# |     Kernels      |
+# --------------------
+
+# ITU-R 601 luma weights, scaled so they sum to 1024.
+LUMA = (306, 601, 117)
+
+SEPIA = (
+    (0.393, 0.769, 0.189),
+    (0.349, 0.686, 0.168),
+    (0.272, 0.534, 0.131)
+)
+
+def grey(pixels):
+    '''Return the luma of every pixel as a (height, width) uint8 array.'''
+
+    rgb = pixels[..., :3].astype(numpy.uint32)
+    return ((rgb[..., 0] * LUMA[0] + rgb[..., 1] * LUMA[1] + rgb[..., 2] * LUMA[2]) >> 10).astype(numpy.uint8)
+
+def with_rgb(pixels, rgb):
+    out = numpy.empty_like(pixels)
+    out[..., :3] = rgb if rgb.ndim == 3 else rgb[..., None]
+    out[..., 3] = pixels[..., 3]
+    return out
+
+def greyscale(pixels):
+    return with_rgb(pixels, grey(pixels))
+
+def invert(pixels):
+    return with_rgb(pixels, 255 - pixels[..., :3])
+
+def invert_greyscale(pixels):
+    return with_rgb(pixels, 255 - grey(pixels))
+
+def sepia(pixels):
+    rgb = pixels[..., :3].astype(numpy.float32) @ numpy.array(SEPIA, numpy.float32).T
+    return with_rgb(pixels, numpy.minimum(rgb, 255).astype(numpy.uint8))
+
+def silhouette(pixels):
+    return with_rgb(pixels, numpy.zeros(pixels.shape[:2], numpy.uint8))
+
+def threshold(pixels, threshold):
+    return with_rgb(pixels, numpy.where(grey(pixels) >= threshold, 255, 0).astype(numpy.uint8))
+
+def invert_threshold(pixels, threshold):
+    return with_rgb(pixels, numpy.where(grey(pixels) >= threshold, 0, 255).astype(numpy.uint8))
+
+def brightness(pixels, brightness):
+    rgb = pixels[..., :3].astype(numpy.int16) + int(brightness)
+    return with_rgb(pixels, numpy.clip(rgb, 0, 255).astype(numpy.uint8))
+
+def darkness(pixels, darkness):
+    rgb = pixels[..., :3].astype(numpy.int16) - int(darkness)
+    return with_rgb(pixels, numpy.clip(rgb, 0, 255).astype(numpy.uint8))
+
+# The kernels by endpoint name, with the param passed on to them if any.
+EFFECTS = {
+    "greyscale": (greyscale, None),
+    "invert": (invert, None),
+    "invert_greyscale": (invert_greyscale, None),
+    "sepia": (sepia, None),
+    "silhouette": (silhouette, None),
+    "threshold": (threshold, "threshold"),
+    "invert_threshold": (invert_threshold, "threshold"),
+    "brightness": (brightness, "brightness"),
+    "darkness": (darkness, "darkness")
+}
+
+# --------------------
+# |     Images       |
+# --------------------
+
+def apply(name, data, values):
+    '''Apply an effect to an image and return the encoded result.
+
+    Returns PNG, or GIF for animated GIFs, see render.process.
+    Meant to run in an executor.
+
+    Params:
+
+    name (str): The effect, e.g. "sepia".
+    data (bytes): The encoded source image.
+    values (dict): The endpoint's values, the effect's param is taken from it.
+    '''
+
+    load()
+    kernel, arg = EFFECTS[name]
+    args = () if arg is None else (values[arg],)
+    return render.process(data, lambda frame: render.Image.fromarray(kernel(numpy.asarray(frame), *args), "RGBA"))
@@ -0,0 +1,298 @@
+import urllib.parse
+from collections import namedtuple
+
+from .avatar import normalize_avatar, size_for
+from .errors import InvalidParam, NotAvailable
+
+REQUIRED = object()
+
+def br_invalid(br):
+    try:
+        if br >= 0 and br <= 255:
+            return False
+        else:
+            return True
+    except:
+        return True
+
+# --------------------
+# |     Params       |
+# --------------------
+
+class Param(namedtuple("Param", "arg key default image convert")):
+    '''A parameter of an endpoint.
+
+    arg (str): The argument name of the Client method.
+    key (str): The querystring key it is sent as.
+    default: The value used when the argument is not given.
+    image (bool): Whether it holds an image url to normalize.
+    convert (callable): Turns the value into the string sent.
+    '''
+
+    __slots__ = ()
+
+def text(arg, key=None, default=REQUIRED, convert=str):
+    return Param(arg, key or arg, default, False, convert)
+
+def image(arg, key=None):
+    return Param(arg, key or arg, REQUIRED, True, str)
+
+def lower(value):
+    return str(value).lower()
+
+# --------------------
+# |     Checks       |
+# --------------------
+
+def byte_range(arg):
+    '''Check an argument is between 0 and 255.'''
+
+    def check(values, dev):
+        if br_invalid(values[arg]):
+            raise InvalidParam("Invalid {}".format(arg))
+    return check
+
+def string(values, dev):
+    if type(values["text"]) != str:
+        raise TypeError("Text must be a string")
+
+def style(*styles):
+    '''Check the text is a string and the style one of `styles`.'''
+
+    def check(values, dev):
+        string(values, dev)
+        values["style"] = values["style"].lower()
+        if values["style"] not in styles:
+            raise TypeError("Style must be one of {}".format(", ".join(styles)))
+    return check
+
+def theme(values, dev):
+    if values["theme"] not in ("dark", "light", "darker"):
+        raise TypeError("Invalid theme, theme can only be one of dark, light, darker")
+
+def greeting_version(values, dev):
+    '''Only the gearz greetings exist in production, and only they take a guild.'''
+
+    if values["version"] != "gearz":
+        if not dev:
+            raise NotAvailable("Anime endpoint is disabled while in production")
+        values.pop("guild", None)
+
+# --------------------
+# |    Endpoints     |
+# --------------------
+
+class Endpoint(namedtuple("Endpoint", "name dev_path prod_path params label check")):
+    '''An endpoint of the API.
+
+    name (str): The Client method name.
+    dev_path (str): Path on the development API.
+    prod_path (str): Path on the production API, None when the
+    endpoint is disabled in production.
+    params (tuple): The Params it takes, in argument order. Params
+    named in a path as {arg} are put in the path.
+    label (str): Name used in error messages.
+    check (callable): Called as check(values, dev) before requesting,
+    may raise or adjust the values.
+    '''
+
+    __slots__ = ()
+
+    def __new__(cls, name, dev_path, prod_path, params, label=None, check=None):
+        return super().__new__(cls, name, dev_path, prod_path, params, label or name.capitalize(), check)
+
+    @property
+    def text(self):
+        '''Whether the endpoint returns text instead of an image.'''
+
+        return self.dev_path.startswith("/text/")
+
+    def path(self, dev):
+        return self.dev_path if dev else self.prod_path
+
+AVATAR = (image("avatar"),)
+AVATAR_TEXT = (image("avatar"), text("text"))
+TEXT = (text("text"),)
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in (
+    Endpoint("blame", "/generators/blame", "/blame", (text("name"),)),
+    Endpoint("triggered", "/generators/triggered", "/triggered", AVATAR),
+    Endpoint("wanted", "/generators/wanted", "/wanted", AVATAR),
+    Endpoint("missing", "/generators/missing", None, AVATAR_TEXT),
+    Endpoint("pls", "/generators/pls", "/pls", (text("name"),)),
+    Endpoint("snapchat", "/generators/snapchat", "/snapchat", TEXT),
+    Endpoint("achievement", "/generators/achievement", "/achievement", AVATAR_TEXT),
+    Endpoint("thesearch", "/generators/thesearch", "/thesearch", AVATAR_TEXT),
+    Endpoint("beautiful", "/generators/beautiful", "/beautiful", AVATAR),
+    Endpoint("facepalm", "/generators/facepalm", "/facepalm", AVATAR),
+    Endpoint("respect", "/generators/respect", "/respect", AVATAR),
+    Endpoint("stepped", "/generators/stepped", "/stepped", AVATAR),
+    Endpoint("tattoo", "/generators/tattoo", "/tattoo", AVATAR),
+    Endpoint("vault", "/generators/vault", "/vault", AVATAR),
+    Endpoint("challenger", "/generators/challenger", None, AVATAR),
+    Endpoint("batslap", "/generators/batslap", "/batslap", (image("slapper"), image("slapped"))),
+    Endpoint("superpunch", "/generators/superpunch", "/superpunch", (image("puncher"), image("punched"))),
+    Endpoint("slap", "/generators/slap", "/slap", (image("slapper"), image("slapped"))),
+    Endpoint("karen", "/generators/karen", None, AVATAR),
+    Endpoint("steam", "/generators/steam", None, AVATAR_TEXT),
+    Endpoint("bobross", "/generators/bobross", None, AVATAR),
+    Endpoint("heavyfear", "/generators/heavyfear", None, AVATAR),
+    Endpoint("painting", "/generators/painting", None, AVATAR),
+    Endpoint("waifu_insult", "/generators/waifuinsult", None, AVATAR, "Waifuinsult"),
+    Endpoint("wreckit", "/generators/wreckit", None, AVATAR),
+    Endpoint("approved", "/overlays/approved", None, AVATAR),
+    Endpoint("rainbow", "/overlays/rainbow", None, AVATAR),
+    Endpoint("rejected", "/overlays/rejected", None, AVATAR),
+    Endpoint("brightness", "/effects/brightness", None, (image("avatar"), text("brightness")), check=byte_range("brightness")),
+    Endpoint("darkness", "/effects/darkness", None, (image("avatar"), text("darkness")), check=byte_range("darkness")),
+    Endpoint("greyscale", "/effects/greyscale", None, AVATAR),
+    Endpoint("invert", "/effects/invert", None, AVATAR),
+    Endpoint("invert_greyscale", "/effects/invertGreyscale", None, AVATAR, "InvertGreyscale"),
+    Endpoint("sepia", "/effects/sepia", None, AVATAR),
+    Endpoint("silhouette", "/effects/silhouette", None, AVATAR),
+    Endpoint("invert_threshold", "/effects/invertThreshold", None, (image("avatar"), text("threshold")), "Threshold", byte_range("threshold")),
+    Endpoint("threshold", "/effects/threshold", None, (image("avatar"), text("threshold")), check=byte_range("threshold")),
+    Endpoint("crush", "/generators/crush", "/crush", (image("crusher"), image("crush"))),
+    Endpoint("welcome", "/greetings/{version}_welcome", "/{version}_welcome", (image("avatar"), text("is_bot", "bot"), text("usertag"), text("guild"), text("version", default="gearz")), check=greeting_version),
+    Endpoint("goodbye", "/greetings/{version}_goodbye", "/{version}_goodbye", (image("avatar"), text("is_bot", "bot"), text("usertag"), text("version", default="gearz")), check=greeting_version),
+    Endpoint("confused", "/generators/confused", None, (image("avatar"), image("photo"))),
+    Endpoint("garbage", "/generators/garbage", None, AVATAR),
+    Endpoint("super_spank", "/generators/superspank", None, (image("spanker"), image("spanked")), "Spanked"),
+    Endpoint("tinder_match", "/generators/tinder", None, (image("avatar"), image("match")), "Tinder Match"),
+    Endpoint("colour", "/generators/colour", None, (text("colour"),)),
+    Endpoint("owoify", "/text/owoify", None, TEXT, "owoify", string),
+    Endpoint("mock", "/text/mock", None, TEXT, check=string),
+    Endpoint("tiny", "/text/tinytext", None, (text("text"), text("style")), "Tiny text", style("tiny", "superscript", "subscript")),
+    Endpoint("cursive", "/text/cursive", None, (text("text"), text("style")), check=style("bold", "normal")),
+    Endpoint("vapor", "/text/vaporwave", None, TEXT, check=string),
+    Endpoint("time", "/generators/time", None, AVATAR),
+    Endpoint("ignore", "/generators/ignore", None, AVATAR),
+    Endpoint("hide", "/generators/hide", None, AVATAR),
+    Endpoint("hates", "/generators/hates", None, AVATAR),
+    Endpoint("girls", "/generators/girls", None, AVATAR),
+    Endpoint("zerotwo", "/generators/02picture", None, AVATAR, "Zero Two"),
+    Endpoint("coffee", "/generators/coffee", None, (text("text1"), text("text2"))),
+    Endpoint("religion", "/generators/religion", None, AVATAR),
+    Endpoint("suggestion", "/generators/suggestion", None, (image("avatar"), text("text", "suggestion"))),
+    Endpoint("kirby", "/generators/kirby", None, AVATAR_TEXT, "Kirby School"),
+    Endpoint("virtual", "/generators/vr", None, AVATAR),
+    Endpoint("changemymind", "/generators/changemymind", None, AVATAR_TEXT, "Change my mind"),
+    Endpoint("sniper", "/generators/sniper", None, AVATAR),
+    Endpoint("osu", "/generators/osu", None, (text("user"), text("theme", default="dark")), "osu", theme),
+    Endpoint("greeting", "/greetings/unified", "/greetings/unified", (
+        text("Type", "type"), text("version"), text("bot", convert=lower), image("avatar"), text("username"),
+        text("discriminator"), text("guildName"), text("memberCount"), text("message", default="")
+    )),
+)}
+
+# Other names endpoints can be requested by.
+ALIASES = {"color": "colour"}
+
+# --------------------
+# |     Routes       |
+# --------------------
+
+quote = urllib.parse.quote
+
+class Route:
+    '''An endpoint compiled for one Client.
+
+    Holds everything about the request that doesn't change between
+    calls, so building one only has to encode the values.
+    '''
+
+    __slots__ = ("endpoint", "dev", "path", "path_params", "query_params", "size")
+
+    def __init__(self, endpoint, dev):
+        self.endpoint = endpoint
+        self.dev = dev
+        self.path = endpoint.path(dev)
+        self.path_params = tuple(param.arg for param in endpoint.params if "{" + param.arg + "}" in endpoint.dev_path)
+        self.query_params = tuple(
+            (param, param.key + "=") for param in endpoint.params if param.arg not in self.path_params
+        )
+        self.size = size_for(endpoint.dev_path)
+
+    def bind(self, args, kwargs, local=False):
+        '''Match call arguments to params, check them and return the values.
+
+        With `local`, the values are for a local transform, which
+        works in production too.
+        '''
+
+        endpoint = self.endpoint
+        if self.path is None and not local:
+            raise NotAvailable("{} endpoint is disabled while in production".format(endpoint.label))
+        if len(args) > len(endpoint.params):
+            raise TypeError("{}() takes {} arguments but {} were given".format(endpoint.name, len(endpoint.params), len(args)))
+        values = {}
+        for i, param in enumerate(endpoint.params):
+            if i < len(args):
+                values[param.arg] = args[i]
+            elif param.arg in kwargs:
+                values[param.arg] = kwargs[param.arg]
+            elif param.default is not REQUIRED:
+                values[param.arg] = param.default
+            else:
+                raise TypeError("{}() missing argument: '{}'".format(endpoint.name, param.arg))
+        unknown = set(kwargs).difference(param.arg for param in endpoint.params)
+        if unknown:
+            raise TypeError("{}() got unexpected arguments: {}".format(endpoint.name, ", ".join(sorted(unknown))))
+        if endpoint.check is not None:
+            endpoint.check(values, self.dev)
+        return values
+
+    def build(self, values):
+        '''Return the (path, query, pairs) for bound values.
+
+        pairs are the (key, value) query params before encoding.
+        '''
+
+        path = self.path
+        if self.path_params:
+            path = path.format(**{arg: quote(str(values[arg]), safe="") for arg in self.path_params})
+        parts = []
+        pairs = []
+        for param, prefix in self.query_params:
+            value = values.get(param.arg)
+            if value is None:
+                continue
+            value = param.convert(value)
+            if param.image:
+                value = normalize_avatar(value, self.size)
+            pairs.append((param.key, value))
+            parts.append(prefix + quote(value, safe=""))
+        return path, "?" + "&".join(parts) if parts else "", pairs
+
+class Target:
+    '''Where a bound call goes on each backend.
+
+    Backends serving the development paths and the production ones
+    get the call built by their own Route, each built once.
+
+    routes (callable): Returns the Route of the endpoint for a dev flag.
+    values (dict): The bound values.
+    path (str): A path and query to send to every backend instead.
+    name (str): The endpoint's name, e.g. greeting, which per endpoint
+    settings are keyed by.
+    '''
+
+    __slots__ = ("routes", "values", "paths", "name")
+
+    def __init__(self, routes=None, values=None, path=None, name=None):
+        self.name = name
+        self.routes = routes
+        self.values = values
+        self.paths = {} if path is None else {True: path, False: path}
+
+    def usable(self, backend):
+        '''Whether a backend serves the endpoint.'''
+
+        return backend.dev in self.paths or self.routes(backend.dev).path is not None
+
+    def url(self, backend):
+        path = self.paths.get(backend.dev)
+        if path is None:
+            path, query, _ = self.routes(backend.dev).build(self.values)
+            path = self.paths[backend.dev] = path + query
+        return backend.url + path
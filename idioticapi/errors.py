@@ -0,0 +1,47 @@
+# --------------------
+# |     Errors       |
+# --------------------
+
+class IdioticError(Exception):
+    pass
+
+class NotAvailable(IdioticError):
+    pass
+
+class InvalidParam(IdioticError):
+    pass
+
+class HTTPException(IdioticError):
+    '''The API answered with a non 200 status code.
+
+    status (int): The status code the API returned.
+    retries (int): How many times the request was retried.
+    '''
+
+    def __init__(self, status, message=None):
+        self.status = status
+        self.retries = 0
+        super().__init__(message or "API Returned a non 200 code: {}".format(status))
+
+class RateLimited(HTTPException):
+    '''The API kept answering 429 after waiting out its rate limit.
+
+    retry_after (float): Seconds the API asked to wait, if it said.
+    '''
+
+    def __init__(self, status=429, retry_after=None):
+        self.retry_after = retry_after
+        super().__init__(status)
+
+class CircuitOpen(IdioticError):
+    '''Requests to a group of endpoints are failing, so this one wasn't made.
+
+    group (str): The endpoint group, e.g. generators.
+    retry_after (float): Seconds until a request will be tried again,
+    None while the circuit is already being probed.
+    '''
+
+    def __init__(self, group, retry_after=None):
+        self.group = group
+        self.retry_after = retry_after
+        super().__init__("The {} endpoints are failing, try again later".format(group))
@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+class Member(namedtuple("Member", "avatar username discriminator bot")):
+    '''A member to render greeting cards for.
+
+    avatar (str): Link to their avatar.
+    username (str): Their name.
+    discriminator (str): The 4 digits after their name.
+    bot (bool): Whether they are a bot. Defaults to False.
+    '''
+
+    __slots__ = ()
+
+    def __new__(cls, avatar, username, discriminator, bot=False):
+        return super().__new__(cls, avatar, username, discriminator, bot)
+
+    @property
+    def usertag(self):
+        return "{}#{}".format(self.username, self.discriminator)
+
+class GreetingTemplate(namedtuple("GreetingTemplate", "type version guild message endpoint")):
+    '''What a guild's greeting cards look like, everything but the member.
+
+    type (str): welcome or farewell. Defaults to welcome.
+    version (str): gearz or anime. Defaults to gearz.
+    guild (str): The guild's name.
+    message (str): Message on the card. Defaults to none.
+    endpoint (str): The endpoint rendering the cards, greeting, or
+    the older welcome and goodbye, which show no member count.
+    Defaults to greeting.
+    '''
+
+    __slots__ = ()
+
+    def __new__(cls, type="welcome", version="gearz", guild=None, message="", endpoint="greeting"):
+        if endpoint not in ("greeting", "welcome", "goodbye"):
+            raise ValueError("endpoint must be greeting, welcome or goodbye")
+        return super().__new__(cls, type, version, guild, message, endpoint)
+
+    def call(self, member, member_count=None):
+        '''Return the (endpoint, kwargs) of the card of a member.
+
+        member_count (int): The member count shown on the card, only
+        used by the greeting endpoint.
+        '''
+
+        if self.endpoint == "greeting":
+            return "greeting", {
+                "Type": self.type, "version": self.version, "bot": member.bot, "avatar": member.avatar,
+                "username": member.username, "discriminator": member.discriminator,
+                "guildName": self.guild, "memberCount": member_count, "message": self.message
+            }
+        kwargs = {"avatar": member.avatar, "is_bot": member.bot, "usertag": member.usertag, "version": self.version}
+        if self.endpoint == "welcome":
+            kwargs["guild"] = self.guild
+        return self.endpoint, kwargs
+
+    def calls(self, members, member_counts=(None,)):
+        '''Yield the (endpoint, kwargs) of the card of every member at every member count.'''
+
+        counts = (None,) if self.endpoint != "greeting" else tuple(member_counts)
+        for member in members:
+            for count in counts:
+                yield self.call(member, count)
@@ -0,0 +1,221 @@
+import bisect
+import logging
+import time
+
+from .cache import endpoint_name
+
+log = logging.getLogger(__name__)
+
+# Latency buckets in seconds, the same as the Prometheus client defaults.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+class Histogram:
+    '''Counts observations into fixed buckets.
+
+    buckets (tuple): The upper bounds of the buckets, an extra
+    bucket catches everything above the last one.
+    '''
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        '''Return the upper bound of the bucket the q quantile falls in, None when empty.'''
+
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class EndpointStats:
+    '''What was measured for one endpoint.
+
+    requests (int): Requests sent, every retry counts.
+    errors (int): Requests that failed or didn't answer 200.
+    retries (int): Requests retried by the retry policy.
+    statuses (dict): How many responses had each status code.
+    latency (Histogram): Seconds from sending to the end of the body.
+    request_bytes (int): Bytes of urls and headers sent.
+    response_bytes (int): Bytes of response bodies received, as sent
+    (compressed) when the response says its length.
+    cache_hits, cache_misses (int): Cache lookups, when a cache is set.
+    deduplicated (int): Calls that joined an identical running request.
+    '''
+
+    __slots__ = ("requests", "errors", "retries", "statuses", "latency", "request_bytes",
+                 "response_bytes", "cache_hits", "cache_misses", "deduplicated")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses = {}
+        self.latency = Histogram(buckets)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.deduplicated = 0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "latency_sum": self.latency.sum,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p99": self.latency.quantile(0.99),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "deduplicated": self.deduplicated
+        }
+
+# Counters exported to Prometheus, as (attribute, metric name, help).
+COUNTERS = (
+    ("requests", "requests_total", "Requests sent to the API."),
+    ("errors", "errors_total", "Requests that failed or didn't answer 200."),
+    ("retries", "retries_total", "Requests retried."),
+    ("request_bytes", "request_bytes_total", "Bytes of urls and headers sent."),
+    ("response_bytes", "response_bytes_total", "Bytes of response bodies received."),
+    ("cache_hits", "cache_hits_total", "Results served from the cache."),
+    ("cache_misses", "cache_misses_total", "Cache lookups that missed."),
+    ("deduplicated", "deduplicated_total", "Calls that shared an identical running request.")
+)
+
+def label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    '''Collects per endpoint metrics of a Client.
+
+    Pass one as Client(metrics=...). Endpoints are named by their
+    method, e.g. greeting, like per endpoint rate limits and cache
+    TTLs. Hooks can be added with the on_request_start and
+    on_request_end decorators:
+
+        @metrics.on_request_end
+        def log(endpoint, url, status, elapsed, error):
+            ...
+
+    endpoint is the endpoint's name. status is None and error set
+    when no response came back. A hook that raises is logged and
+    doesn't affect the request.
+
+    buckets (tuple): Latency histogram buckets in seconds.
+    '''
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.endpoints = {}
+        self._start_hooks = []
+        self._end_hooks = []
+
+    def __repr__(self):
+        return "<Metrics endpoints={}>".format(len(self.endpoints))
+
+    def on_request_start(self, hook):
+        '''Call hook(endpoint, url) before every request is sent.'''
+
+        self._start_hooks.append(hook)
+        return hook
+
+    def on_request_end(self, hook):
+        '''Call hook(endpoint, url, status, elapsed, error) after every request.'''
+
+        self._end_hooks.append(hook)
+        return hook
+
+    def get(self, endpoint):
+        '''Return the EndpointStats of an endpoint name.
+
+        Paths are counted under their last segment.
+        '''
+
+        name = endpoint_name(endpoint)
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats(self.buckets)
+        return stats
+
+    def start(self, endpoint, url, headers):
+        '''Record a request being sent, returns what end() needs.'''
+
+        stats = self.get(endpoint)
+        stats.requests += 1
+        stats.request_bytes += len(url) + sum(len(key) + len(value) + 4 for key, value in headers.items())
+        self._call(self._start_hooks, endpoint, url)
+        return stats, endpoint, url, time.monotonic()
+
+    def end(self, started, status, size, error):
+        '''Record how a request started with start() ended.'''
+
+        stats, endpoint, url, begun = started
+        elapsed = time.monotonic() - begun
+        stats.latency.observe(elapsed)
+        stats.response_bytes += size
+        if status is not None:
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if error is not None or status != 200:
+            stats.errors += 1
+        self._call(self._end_hooks, endpoint, url, status, elapsed, error)
+
+    def _call(self, hooks, *args):
+        for hook in hooks:
+            try:
+                hook(*args)
+            except Exception:
+                log.exception("Metrics hook %r raised", hook)
+
+    def stats(self):
+        '''Return the metrics of every endpoint as plain dicts.'''
+
+        return {name: stats.as_dict() for name, stats in self.endpoints.items()}
+
+    def prometheus(self, prefix="idioticapi"):
+        '''Return the metrics in the Prometheus text exposition format.'''
+
+        lines = []
+        names = sorted(self.endpoints)
+        for attr, metric, text in COUNTERS:
+            lines.append("# HELP {}_{} {}".format(prefix, metric, text))
+            lines.append("# TYPE {}_{} counter".format(prefix, metric))
+            for name in names:
+                lines.append('{}_{}{{endpoint="{}"}} {}'.format(prefix, metric, label(name), getattr(self.endpoints[name], attr)))
+
+        lines.append("# HELP {}_responses_total Responses by status code.".format(prefix))
+        lines.append("# TYPE {}_responses_total counter".format(prefix))
+        for name in names:
+            for status, count in sorted(self.endpoints[name].statuses.items()):
+                lines.append('{}_responses_total{{endpoint="{}",status="{}"}} {}'.format(prefix, label(name), status, count))
+
+        metric = prefix + "_request_duration_seconds"
+        lines.append("# HELP {} Seconds from sending a request to the end of its body.".format(metric))
+        lines.append("# TYPE {} histogram".format(metric))
+        for name in names:
+            latency = self.endpoints[name].latency
+            seen = 0
+            for bound, count in zip(latency.buckets + (float("inf"),), latency.counts):
+                seen += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append('{}_bucket{{endpoint="{}",le="{}"}} {}'.format(metric, label(name), le, seen))
+            lines.append('{}_sum{{endpoint="{}"}} {}'.format(metric, label(name), repr(latency.sum)))
+            lines.append('{}_count{{endpoint="{}"}} {}'.format(metric, label(name), latency.count))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,181 @@
+import asyncio
+import email.utils
+import time
+
+def parse_retry_after(headers):
+    '''Return the seconds to wait from a response's rate limit headers, or None.
+
+    Understands Retry-After as seconds or an HTTP date, and
+    X-RateLimit-Remaining with X-RateLimit-Reset given as seconds
+    or a unix timestamp.
+    '''
+
+    value = headers.get("Retry-After")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            date = email.utils.parsedate_to_datetime(value)
+            if date is not None:
+                return max(0.0, date.timestamp() - time.time())
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is not None and reset is not None:
+        try:
+            if float(remaining) > 0:
+                return None
+            reset = float(reset)
+        except ValueError:
+            return None
+        # Large values are unix timestamps, small ones seconds from now.
+        return max(0.0, reset - time.time() if reset > 1e9 else reset)
+    return None
+
+class TokenBucket:
+    '''A token bucket allowing `rate` requests per second.
+
+    Waiters are served in order. The rate can be lowered and raised
+    while in use and the bucket can be paused for a number of seconds.
+    '''
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = None
+
+    def __repr__(self):
+        return "<TokenBucket rate={:.2f} waiting={}>".format(self.rate, self.waiting)
+
+    def _reserve(self):
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        '''Wait until a request may be made.'''
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                wait = self._reserve()
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._reserve()
+        finally:
+            self.waiting -= 1
+
+    def pause(self, seconds):
+        '''Hold every request for `seconds`.'''
+
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 1)
+
+class RateLimiter:
+    '''A client side rate limiter that learns from the API.
+
+    Requests go through a global token bucket and, for endpoints
+    given in `per_endpoint`, their own bucket as well. When the API
+    answers 429 the rate is halved and requests are held for as
+    long as Retry-After (or the X-RateLimit headers) asks, then it
+    creeps back up with every successful request. Pass it to the
+    Client as `ratelimiter` to enable it.
+    '''
+
+    def __init__(self, rate=10, burst=None, per_endpoint=None, min_rate=0.5, max_retries=5):
+        '''Constructs the rate limiter.
+
+        rate (float): Requests per second allowed at most. Defaults to 10.
+
+        burst (int): How many requests may go out at once after
+        being idle. Defaults to `rate`.
+
+        per_endpoint (dict): Requests per second for single endpoints,
+        keyed by endpoint name, the Client method (e.g. "triggered"
+        or "greeting").
+
+        min_rate (float): The rate never drops below this. Defaults to 0.5.
+
+        max_retries (int): How many times a request answered 429 is
+        queued again before RateLimited is raised. Defaults to 5.
+        '''
+
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.max_retries = max_retries
+        self.limited = 0
+        self.bucket = TokenBucket(rate, burst)
+        self.endpoints = {
+            name: TokenBucket(endpoint_rate)
+            for name, endpoint_rate in (per_endpoint or {}).items()
+        }
+        self._max_rates = dict(per_endpoint or {})
+
+    def __repr__(self):
+        return "<RateLimiter rate={:.2f} queue_depth={}>".format(self.rate, self.queue_depth)
+
+    @property
+    def rate(self):
+        '''The requests per second currently allowed.'''
+
+        return self.bucket.rate
+
+    @property
+    def queue_depth(self):
+        '''How many requests are waiting for their turn.'''
+
+        return self.bucket.waiting + sum(bucket.waiting for bucket in self.endpoints.values())
+
+    async def acquire(self, name):
+        '''Wait until a request to the endpoint `name` may be made.'''
+
+        bucket = self.endpoints.get(name)
+        if bucket is not None:
+            await bucket.acquire()
+        await self.bucket.acquire()
+
+    def update(self, name, status, headers):
+        '''Learn from a response to the endpoint `name`.
+
+        Returns the seconds the API asked to wait, or None.
+        '''
+
+        retry_after = parse_retry_after(headers)
+        buckets = [self.bucket]
+        if name in self.endpoints:
+            buckets.append(self.endpoints[name])
+        if status == 429:
+            self.limited += 1
+            for bucket in buckets:
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.pause(1 / bucket.rate if retry_after is None else retry_after)
+            return retry_after
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate / 100)
+        if name in self.endpoints:
+            bucket = self.endpoints[name]
+            bucket.rate = min(self._max_rates[name], bucket.rate + self._max_rates[name] / 100)
+        if retry_after is not None:
+            for bucket in buckets:
+                bucket.pause(retry_after)
+        return retry_after
+
+    def stats(self):
+        '''Return the current rates and queue depth as a dict.'''
+
+        return {
+            "rate": self.rate,
+            "queue_depth": self.queue_depth,
+            "limited": self.limited,
+            "endpoints": {name: bucket.rate for name, bucket in self.endpoints.items()}
+        }
@@ -0,0 +1,163 @@
+import functools
+import importlib.util
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .errors import InvalidParam
+
+AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# Pillow is only imported when something is rendered, see load().
+Image = ImageSequence = None
+
+def load():
+    '''Import Pillow.'''
+
+    global Image, ImageSequence
+    if Image is None:
+        from PIL import Image, ImageSequence
+
+# Local versions of the colour swatch and the /overlays/ endpoints.
+
+# --------------------
+# |     Swatches     |
+# --------------------
+
+SWATCH_SIZE = 256
+
+HEX = re.compile(r"^#?([0-9a-f]{3}|[0-9a-f]{6}|[0-9a-f]{8})$")
+RGB = re.compile(r"^rgba?\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*(?:,\s*([\d.]+)\s*)?\)$")
+
+def parse_colour(colour):
+    '''Return the (r, g, b, a) of a hex, rgb() or rgba() colour.
+
+    rgba() takes alpha as 0 to 1, like CSS.
+    '''
+
+    colour = str(colour).strip().lower()
+    match = HEX.match(colour)
+    if match:
+        digits = match.group(1)
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) == 6:
+            digits += "ff"
+        return tuple(int(digits[i:i + 2], 16) for i in range(0, 8, 2))
+    match = RGB.match(colour)
+    if match:
+        rgb = tuple(int(value) for value in match.group(1, 2, 3))
+        alpha = 1.0 if match.group(4) is None else float(match.group(4))
+        if max(rgb) <= 255 and alpha <= 1:
+            return rgb + (int(round(alpha * 255)),)
+    raise InvalidParam("Invalid colour")
+
+@functools.lru_cache(maxsize=256)
+def encoded_swatch(rgba):
+    load()
+    out = io.BytesIO()
+    Image.new("RGBA", (SWATCH_SIZE, SWATCH_SIZE), rgba).save(out, "PNG")
+    return out.getvalue()
+
+def swatch(colour):
+    '''Return a PNG of a solid colour, encoded once per colour.'''
+
+    return encoded_swatch(parse_colour(colour))
+
+# --------------------
+# |     Overlays     |
+# --------------------
+
+class Templates:
+    '''Overlay templates loaded from a directory.
+
+    The template of an endpoint is `<name>.png` in `directory`, e.g.
+    approved.png. Each is decoded on first use and kept in memory,
+    as are its resizes to the latest `max_sized` avatar sizes seen.
+    Whether a template exists is checked once per name.
+    '''
+
+    def __init__(self, directory, max_sized=32):
+        self.directory = directory
+        self.max_sized = max_sized
+        self._decoded = {}
+        self._sized = OrderedDict()
+        self._exists = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        exists = self._exists.get(name)
+        if exists is None:
+            exists = self._exists[name] = name in self._decoded or os.path.isfile(self.path(name))
+        return exists
+
+    def path(self, name):
+        return os.path.join(self.directory, name + ".png")
+
+    def get(self, name, size):
+        '''Return the template of `name` as an RGBA image of `size`.'''
+
+        key = (name, size)
+        load()
+        with self._lock:
+            template = self._sized.get(key)
+            if template is not None:
+                self._sized.move_to_end(key)
+                return template
+            template = self._decoded.get(name)
+            if template is None:
+                with Image.open(self.path(name)) as image:
+                    template = self._decoded[name] = image.convert("RGBA")
+            if template.size != size:
+                template = template.resize(size, Image.LANCZOS)
+            self._sized[key] = template
+            if len(self._sized) > self.max_sized:
+                self._sized.popitem(last=False)
+        return template
+
+def process(data, func):
+    '''Decode an image, run `func` on each frame and encode the result.
+
+    `func` takes and returns an RGBA Image. Still images come back as
+    PNG. Animated GIFs are processed frame by frame and come back as
+    GIF, with their frame durations and loop count kept.
+    '''
+
+    load()
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, SyntaxError) as exc:
+        raise ValueError("Avatar is not an image Pillow can read") from exc
+
+    out = io.BytesIO()
+    if not getattr(image, "is_animated", False):
+        func(image.convert("RGBA")).save(out, "PNG")
+        return out.getvalue()
+
+    frames = []
+    durations = []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+        frames.append(func(frame.convert("RGBA")))
+    frames[0].save(
+        out, "GIF", save_all=True, append_images=frames[1:], duration=durations,
+        loop=image.info.get("loop", 0), disposal=2
+    )
+    return out.getvalue()
+
+def overlay(templates, name, data):
+    '''Composite the template of `name` onto an image.
+
+    Returns PNG, or GIF for animated GIFs. Meant to run in an executor.
+
+    Params:
+
+    templates (Templates): Where the template is loaded from.
+    name (str): The endpoint, e.g. "approved".
+    data (bytes): The encoded avatar.
+    '''
+
+    return process(data, lambda frame: Image.alpha_composite(frame, templates.get(name, frame.size)))
@@ -0,0 +1,83 @@
+import asyncio
+import random
+import time
+
+from .errors import HTTPException, RateLimited
+
+class RetryPolicy:
+    '''When and how long to wait before trying a failed request again.
+
+    Failed requests are retried with exponential backoff and full
+    jitter: before retry n the Client sleeps a random time between
+    0 and min(cap, base * 2 ** n) seconds. Only the status codes in
+    `statuses` and the exceptions in `exceptions` are retried, and
+    never past `deadline` seconds after the first attempt. Pass it
+    to the Client as `retry` to enable it.
+    '''
+
+    def __init__(self, attempts=3, base=0.5, cap=10.0, deadline=30.0,
+                 statuses=(408, 429, 500, 502, 503, 504), exceptions=None):
+        '''Constructs the policy.
+
+        attempts (int): How many times a request is made at most,
+        counting the first one. Defaults to 3.
+
+        base (float): Backoff in seconds before the first retry. Defaults to 0.5.
+
+        cap (float): Longest backoff in seconds. Defaults to 10.
+
+        deadline (float): Seconds after the first attempt when no more
+        retries are started. Defaults to 30.
+
+        statuses (tuple): Status codes worth retrying.
+
+        exceptions (tuple): Exceptions worth retrying. Defaults to
+        connection errors, broken responses and timeouts.
+        '''
+
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        if exceptions is None:
+            import aiohttp
+            exceptions = (
+                aiohttp.ClientConnectionError,
+                aiohttp.ClientPayloadError,
+                asyncio.TimeoutError
+            )
+        self.exceptions = exceptions
+        self.retries = 0
+        self.gave_up = 0
+
+    def __repr__(self):
+        return "<RetryPolicy attempts={} retries={} gave_up={}>".format(self.attempts, self.retries, self.gave_up)
+
+    def retryable(self, error):
+        '''Whether an error is worth another attempt.'''
+
+        if isinstance(error, RateLimited):
+            return False
+        if isinstance(error, HTTPException):
+            return error.status in self.statuses
+        return isinstance(error, self.exceptions)
+
+    def delay(self, error, retries, started):
+        '''Return how long to wait before retrying, or None to give up.
+
+        Params:
+
+        error (Exception): What the last attempt failed with.
+        retries (int): How many retries were already made.
+        started (float): time.monotonic() of the first attempt.
+        '''
+
+        if not self.retryable(error):
+            return None
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** retries))
+        if retries + 1 >= self.attempts or time.monotonic() + delay - started > self.deadline:
+            self.gave_up += 1
+            return None
+        self.retries += 1
+        return delay
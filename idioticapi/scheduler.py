@@ -0,0 +1,109 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+# Priority classes, lower goes first.
+PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+NAMES = {value: name for name, value in PRIORITIES.items()}
+
+def priority_value(priority):
+    '''Return the number of a priority class name, numbers are returned as they are.'''
+
+    if isinstance(priority, int):
+        return priority
+    try:
+        return PRIORITIES[priority]
+    except KeyError:
+        raise ValueError("Unknown priority: {}".format(priority)) from None
+
+class Scheduler:
+    '''Bounds the requests in flight and hands out free slots by priority.
+
+    At most `concurrency` requests are sent at once, the others wait.
+    When a slot frees up, the waiting request with the highest
+    priority gets it: interactive, then normal, then background, or
+    any number, lower first. So low priority work never waits
+    forever, a request that has waited `aging` seconds counts as one
+    class higher: background work queued `2 * aging` seconds ago goes
+    before interactive work queued now. Retries keep the age of their
+    first attempt. Pass it to the Client as `scheduler`.
+    '''
+
+    def __init__(self, concurrency=8, aging=2.0):
+        '''Constructs the scheduler.
+
+        concurrency (int): How many requests are sent at once at most.
+        Defaults to 8.
+
+        aging (float): Seconds of waiting worth one priority class.
+        Defaults to 2.
+        '''
+
+        self.concurrency = concurrency
+        self.aging = aging
+        self.active = 0
+        self.dispatched = {}
+        self.waited = {}
+        self._queue = []
+        self._order = itertools.count()
+
+    def __repr__(self):
+        return "<Scheduler active={}/{} waiting={}>".format(self.active, self.concurrency, self.waiting)
+
+    @property
+    def waiting(self):
+        '''How many requests are waiting for a slot.'''
+
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    async def acquire(self, priority="normal", since=None):
+        '''Wait for a slot, release() it once the request is done.
+
+        priority (str or int): The request's priority class.
+        since (float): When the request was first queued, as
+        time.monotonic(). Defaults to now.
+        '''
+
+        priority = priority_value(priority)
+        now = time.monotonic()
+        if self.active < self.concurrency:
+            self.active += 1
+            self._count(priority, 0.0)
+            return
+        deadline = (now if since is None else since) + priority * self.aging
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._queue, (deadline, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled right after being handed a slot, pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        self._count(priority, time.monotonic() - now)
+
+    def release(self):
+        '''Free a slot taken by acquire(), the next waiting request gets it.'''
+
+        while self._queue:
+            future = heapq.heappop(self._queue)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self):
+        '''Return the requests dispatched and seconds waited per priority class.'''
+
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "dispatched": dict(self.dispatched),
+            "waited": dict(self.waited)
+        }
+
+    def _count(self, priority, waited):
+        priority = NAMES.get(priority, priority)
+        self.dispatched[priority] = self.dispatched.get(priority, 0) + 1
+        self.waited[priority] = self.waited.get(priority, 0.0) + waited
@@ -0,0 +1,55 @@
+import asyncio
+
+class SingleFlight:
+    '''Shares one in-flight call between identical concurrent requests.
+
+    The first caller for a key starts the call, everyone asking for
+    the same key while it runs waits for that call and gets its
+    result or its exception. Cancelling one waiter does not cancel
+    the call for the others, the call is cancelled once every one
+    of its waiters is.
+    '''
+
+    def __init__(self):
+        self.deduplicated = 0
+        self._calls = {}
+
+    def __repr__(self):
+        return "<SingleFlight in_flight={} deduplicated={}>".format(len(self._calls), self.deduplicated)
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __contains__(self, key):
+        return key in self._calls
+
+    async def do(self, key, func, *args):
+        '''Run `func(*args)` for a key, or join the call already running for it.'''
+
+        entry = self._calls.get(key)
+        if entry is not None:
+            self.deduplicated += 1
+        else:
+            call = asyncio.ensure_future(func(*args))
+            # The call and how many callers are waiting for it.
+            entry = self._calls[key] = [call, 0]
+            call.add_done_callback(lambda done: self._forget(key, done))
+        call = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(call)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not call.done():
+                # The last waiter left early, nobody wants the result.
+                if self._calls.get(key) is entry:
+                    del self._calls[key]
+                call.cancel()
+
+    def _forget(self, key, call):
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is call:
+            del self._calls[key]
+        # Retrieve the exception, so one nobody waited for isn't logged.
+        if not call.cancelled():
+            call.exception()
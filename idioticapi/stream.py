@@ -0,0 +1,85 @@
+import asyncio
+import inspect
+
+def make_sink(into):
+    '''Return an async callable writing chunks to `into`.
+
+    `into` is either an object with a write method, such as a file
+    or io.BytesIO (coroutine write methods are awaited), or a
+    writable buffer such as a preallocated bytearray, which is
+    filled from the start.
+    '''
+
+    write = getattr(into, "write", None)
+    if write is not None:
+        async def sink(chunk):
+            result = write(chunk)
+            if inspect.isawaitable(result):
+                await result
+        return sink
+
+    view = memoryview(into).cast("B")
+    offset = [0]
+
+    async def sink(chunk):
+        end = offset[0] + len(chunk)
+        if end > len(view):
+            raise ValueError("Buffer is too small for the image")
+        view[offset[0]:end] = chunk
+        offset[0] = end
+    return sink
+
+class StreamIterator:
+    '''An async iterator over the chunks of a streamed image.
+
+    `start` is called with an async sink once iteration begins and
+    runs in the background, at most `buffer` chunks are held before
+    it waits for them to be consumed. Leaving an `async with` block
+    around it, or calling aclose(), stops the download.
+    '''
+
+    _end = object()
+
+    def __init__(self, start, buffer=2):
+        self._start = start
+        self._queue = asyncio.Queue(maxsize=buffer)
+        self._task = None
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def __anext__(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        item = await self._queue.get()
+        if item is self._end:
+            self._queue.put_nowait(item)
+            raise StopAsyncIteration
+        if isinstance(item, BaseException):
+            self._queue.put_nowait(self._end)
+            raise item
+        return item
+
+    async def aclose(self):
+        '''Stop the download if it is still running.'''
+
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        try:
+            await self._start(self._queue.put)
+        except Exception as exc:
+            await self._queue.put(exc)
+        else:
+            await self._queue.put(self._end)
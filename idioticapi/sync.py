@@ -0,0 +1,137 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from .Client import Client
+
+class SyncClient:
+    '''A blocking Client for code that doesn't run an event loop.
+
+    Runs one Client, with its session and connection pool, on an
+    event loop in a background thread. Every endpoint method of
+    Client is available as a blocking call, e.g.
+    `client.triggered(avatar)`, and can be called from many threads
+    at once. submit() returns a concurrent.futures.Future instead,
+    for fanning out calls.
+
+    Takes the same arguments as Client, plus:
+
+    timeout (float): Seconds a blocking call waits for its result
+    before raising concurrent.futures.TimeoutError. The request is
+    cancelled then. Defaults to None, no limit.
+
+    Use as a context manager, or call close() when done.
+    '''
+
+    def __init__(self, token, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="idioticapi-loop", daemon=True)
+        self._thread.start()
+
+        async def create():
+            return Client(token, *args, **kwargs)
+
+        self.client = self._submit(create()).result()
+
+    def __repr__(self):
+        return "<IdioticAPI SyncClient>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        if name == "client":
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            return self._wait(self._submit(attr(*args, **kwargs)))
+        return call
+
+    def submit(self, method, *args, **kwargs):
+        '''Start an endpoint call and return a concurrent.futures.Future.
+
+        Params:
+
+        method (str): The endpoint, e.g. "wanted".
+
+        Other arguments are passed on to the endpoint method, e.g.
+        `futures = [client.submit("wanted", url) for url in urls]`.
+        '''
+
+        return self._submit(self.client._method(method)(*args, **kwargs))
+
+    def map(self, method, args, concurrency=8, ordered=False):
+        '''Call an endpoint for many inputs, a few at a time.
+
+        Like Client.map, but returns a plain iterator of BatchResult
+        objects. `args` is read from the loop thread.
+        '''
+
+        batch = self.client.map(method, args, concurrency, ordered)
+        try:
+            while True:
+                try:
+                    yield self._submit(batch.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._submit(batch.aclose()).result()
+
+    def iter_stream(self, method, *args, chunk_size=64 * 1024, **kwargs):
+        '''Download an image as an iterator of chunks.
+
+        Like Client.iter_stream, but returns a plain iterator:
+        `for chunk in client.iter_stream("triggered", avatar)`.
+        Each chunk is waited for up to `timeout`.
+        '''
+
+        async def create():
+            return self.client.iter_stream(method, *args, chunk_size=chunk_size, **kwargs)
+
+        stream = self._submit(create()).result()
+        try:
+            while True:
+                try:
+                    yield self._wait(self._submit(stream.__anext__()))
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._submit(stream.aclose()).result()
+
+    def close(self):
+        '''Close the session and stop the loop thread.'''
+
+        if not self.loop.is_running():
+            return
+        self._submit(self.client.close()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _wait(self, future):
+        '''Return the result of a submitted call, cancelling it on timeout.'''
+
+        try:
+            return future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def _submit(self, coro):
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SyncClient can't be called from its own loop, use client.client there")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
@@ -0,0 +1,180 @@
+import io
+
+from . import render
+
+# Pillow's names of the formats results can be transcoded to.
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "jpg": "JPEG", "png": "PNG"}
+
+class Transcoder:
+    '''Shrinks image results before they are returned.
+
+    Still images are re-encoded as `format` at `quality` and animated
+    GIFs as `animation`, either GIF with a palette of `colours` or
+    animated WebP. Both are scaled down to fit `max_size` first. A
+    result that would not come out smaller is returned as it was.
+    Pass it to the Client as `transcoder`, results are then
+    transcoded in the Client's executor and the transcoded variant
+    is cached next to the original. Streams are not transcoded.
+
+    Needs Pillow, see `pip install idioticapi[effects]`.
+    '''
+
+    def __init__(self, format="webp", quality=80, max_size=None, colours=None,
+                 animation="gif", endpoints=None, min_bytes=0, background=(255, 255, 255)):
+        '''Constructs the transcoder.
+
+        format (str): What still images become, webp, jpeg or png.
+        None keeps their format. Defaults to webp.
+
+        quality (int): Quality of WebP and JPEG from 1 to 100.
+        Defaults to 80.
+
+        max_size (int): Longest side in pixels, larger images are
+        scaled down. Defaults to None, no limit.
+
+        colours (int): Colours GIF frames are reduced to, from 2 to
+        256. Defaults to None, which keeps up to 256.
+
+        animation (str): What animated GIFs become, gif or webp.
+        Defaults to gif.
+
+        endpoints (set): Names of the endpoints to transcode, e.g.
+        {"triggered", "greeting"}. Defaults to None, every image
+        endpoint.
+
+        min_bytes (int): Results smaller than this are left alone.
+        Defaults to 0.
+
+        background (tuple): The RGB colour transparent pixels get when
+        saved as JPEG. Defaults to white.
+        '''
+
+        if not render.AVAILABLE:
+            raise ImportError("Transcoder needs Pillow, install it with pip install idioticapi[effects]")
+        if format is not None and format.lower() not in FORMATS:
+            raise ValueError("Unknown format: {}".format(format))
+        if animation not in ("gif", "webp"):
+            raise ValueError("animation must be gif or webp")
+        if colours is not None and not 2 <= colours <= 256:
+            raise ValueError("colours must be from 2 to 256")
+        self.format = None if format is None else FORMATS[format.lower()]
+        self.quality = quality
+        self.max_size = max_size
+        self.colours = colours
+        self.animation = animation
+        self.endpoints = None if endpoints is None else set(endpoints)
+        self.min_bytes = min_bytes
+        self.background = tuple(background)
+        self.transcoded = 0
+        self.saved_bytes = 0
+
+    def __repr__(self):
+        return "<Transcoder {}>".format(self.variant)
+
+    @property
+    def variant(self):
+        '''A name for these settings, part of the cache key of results.'''
+
+        return "{}:q{}:max{}:c{}:{}".format(
+            (self.format or "keep").lower(), self.quality, self.max_size, self.colours, self.animation)
+
+    def applies(self, name):
+        '''Whether results of the endpoint `name` are transcoded.'''
+
+        return self.endpoints is None or name in self.endpoints
+
+    def key(self, key):
+        '''Return the cache key of the transcoded variant of a result.'''
+
+        return key + (self.variant,)
+
+    def transcode(self, data):
+        '''Return an image transcoded with these settings.
+
+        Data Pillow can't read is returned as it was. Meant to run in
+        an executor.
+        '''
+
+        if len(data) < self.min_bytes:
+            return data
+        render.load()
+        try:
+            image = render.Image.open(io.BytesIO(data))
+            image.load()
+        except (OSError, SyntaxError):
+            return data
+
+        if getattr(image, "is_animated", False):
+            out, resized = self._animated(image)
+        elif self.format is None and image.format != "GIF" and not self._too_big(image):
+            # Re-encoding in the same format gains next to nothing.
+            return data
+        else:
+            out, resized = self._still(image)
+        if len(out) >= len(data) and not resized:
+            return data
+        self.transcoded += 1
+        self.saved_bytes += len(data) - len(out)
+        return out
+
+    def _too_big(self, image):
+        return self.max_size is not None and max(image.size) > self.max_size
+
+    def _fit(self, frame):
+        '''Scale an RGBA frame down to fit max_size, return it and whether it was.'''
+
+        if not self._too_big(frame):
+            return frame, False
+        scale = self.max_size / max(frame.size)
+        size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+        return frame.resize(size, render.Image.LANCZOS), True
+
+    def _still(self, image):
+        format = self.format or image.format or "PNG"
+        frame, resized = self._fit(image.convert("RGBA"))
+        out = io.BytesIO()
+        if format == "JPEG":
+            flat = render.Image.new("RGBA", frame.size, self.background + (255,))
+            render.Image.alpha_composite(flat, frame).convert("RGB").save(
+                out, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        elif format == "WEBP":
+            frame.save(out, "WEBP", quality=self.quality, method=4)
+        elif format == "GIF":
+            self._palette(frame).save(out, "GIF", optimize=True)
+        else:
+            frame.save(out, "PNG", optimize=True)
+        return out.getvalue(), resized
+
+    def _animated(self, image):
+        frames = []
+        durations = []
+        resized = False
+        for frame in render.ImageSequence.Iterator(image):
+            durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+            frame, resized = self._fit(frame.convert("RGBA"))
+            frames.append(frame)
+        loop = image.info.get("loop", 0)
+        out = io.BytesIO()
+        if self.animation == "webp":
+            frames[0].save(out, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+                           loop=loop, quality=self.quality, method=4)
+        else:
+            frames = [self._palette(frame) for frame in frames]
+            frames[0].save(out, "GIF", save_all=True, append_images=frames[1:], duration=durations,
+                           loop=loop, disposal=2, optimize=True)
+        return out.getvalue(), resized
+
+    def _palette(self, frame):
+        '''Reduce an RGBA frame to a palette, keeping its transparent pixels.
+
+        The last of the colours is kept for transparency, pixels less
+        than half opaque get it.
+        '''
+
+        colours = self.colours or 256
+        alpha = frame.getchannel("A")
+        out = frame.convert("RGB").quantize(colours - 1)
+        if alpha.getextrema()[0] < 128:
+            out.paste(colours - 1, mask=alpha.point(lambda a: 255 if a < 128 else 0))
+            out.info["transparency"] = colours - 1
+        return out
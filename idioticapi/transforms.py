@@ -0,0 +1,108 @@
+import random
+import re
+
+# Local versions of the /text/ endpoints. They are plain character
+# transforms, so they run with precomputed translate tables and a few
+# regex passes instead of a round trip to the API. They were not
+# checked against the API's outputs, so results may differ from it.
+
+# --------------------
+# |     Tables       |
+# --------------------
+
+LOWER = "abcdefghijklmnopqrstuvwxyz"
+UPPER = LOWER.upper()
+
+def table(source, target):
+    '''Build a translate table, characters mapped to themselves are left out.'''
+
+    return {ord(a): b for a, b in zip(source, target) if a != b}
+
+SMALL_CAPS = "ᴀʙᴄᴅᴇꜰɢʜɪᴊᴋʟᴍɴᴏᴘǫʀꜱᴛᴜᴠᴡxʏᴢ"
+SUPERSCRIPT = "ᵃᵇᶜᵈᵉᶠᵍʰⁱʲᵏˡᵐⁿᵒᵖᵠʳˢᵗᵘᵛʷˣʸᶻ"
+SUBSCRIPT = "ₐbcdₑfgₕᵢⱼₖₗₘₙₒₚqᵣₛₜᵤᵥwₓyz"
+
+TINY = {
+    "tiny": table(LOWER + UPPER, SMALL_CAPS * 2),
+    "superscript": table(LOWER + UPPER + "0123456789+-=()", SUPERSCRIPT * 2 + "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾"),
+    "subscript": table(LOWER + UPPER + "0123456789+-=()", SUBSCRIPT * 2 + "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎")
+}
+
+def alphabet(upper, lower, holes=None):
+    '''Map A-Z and a-z onto a run of mathematical letters.
+
+    Letters the run leaves out because they were encoded earlier in
+    the Letterlike Symbols block are taken from `holes`.
+    '''
+
+    holes = holes or {}
+    target = [holes.get(c, chr(upper + i)) for i, c in enumerate(UPPER)]
+    target += [holes.get(c, chr(lower + i)) for i, c in enumerate(LOWER)]
+    return table(UPPER + LOWER, target)
+
+CURSIVE = {
+    "normal": alphabet(0x1D49C, 0x1D4B6, {
+        "B": "ℬ", "E": "ℰ", "F": "ℱ", "H": "ℋ", "I": "ℐ", "L": "ℒ", "M": "ℳ", "R": "ℛ",
+        "e": "ℯ", "g": "ℊ", "o": "ℴ"
+    }),
+    "bold": alphabet(0x1D4D0, 0x1D4EA)
+}
+
+# Printable ASCII to its fullwidth form, and space to the ideographic space.
+VAPOR = {i: chr(i + 0xFEE0) for i in range(0x21, 0x7F)}
+VAPOR[0x20] = "　"
+
+FACES = ("(・`ω´・)", ";;w;;", "owo", "UwU", ">w<", "^w^")
+
+# Passes of owoify, in order.
+OWO = (
+    (re.compile("[rl]"), "w"),
+    (re.compile("[RL]"), "W"),
+    (re.compile("n([aeiou])"), "ny\\1"),
+    (re.compile("N([aeiou])"), "Ny\\1"),
+    (re.compile("N([AEIOU])"), "NY\\1"),
+    (re.compile("ove"), "uv")
+)
+BANGS = re.compile("!+")
+
+# --------------------
+# |   Transforms     |
+# --------------------
+
+def owoify(text):
+    '''owoify a text, runs of ! become a random face like the API does.'''
+
+    for pattern, repl in OWO:
+        text = pattern.sub(repl, text)
+    if "!" in text:
+        text = BANGS.sub(lambda match: " {} ".format(random.choice(FACES)), text)
+    return text
+
+def mock(text):
+    '''Alternate the case of every letter, starting lower case.'''
+
+    return "".join(c.upper() if i % 2 else c.lower() for i, c in enumerate(text))
+
+def tiny(text, style):
+    '''Make a text tiny, style is one of tiny, superscript, subscript.'''
+
+    return text.translate(TINY[style.lower()])
+
+def cursive(text, style):
+    '''Make a text cursive, style is one of normal or bold.'''
+
+    return text.translate(CURSIVE[style.lower()])
+
+def vapor(text):
+    '''Make a text vaporwave.'''
+
+    return text.translate(VAPOR)
+
+# The transforms by endpoint name, called with the endpoint's params.
+TRANSFORMS = {
+    "owoify": owoify,
+    "mock": mock,
+    "tiny": tiny,
+    "cursive": cursive,
+    "vapor": vapor
+}
@@ -17,5 +17,9 @@ setuptools.setup(
     license="MIT",
     packages=packages,
     include_package_data=True,
-    install_requires=["aiohttp>=2.0.0"]
+    install_requires=["aiohttp>=2.0.0"],
+    extras_require={
+        "speedups": ["orjson", "Brotli"],
+        "effects": ["numpy", "Pillow"]
+    }
 )